@@ -1,25 +1,243 @@
 from __future__ import annotations
 
-from datetime import datetime
+import atexit
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
 import hashlib
-import shutil
+import hmac
+import math
+import secrets
 from pathlib import Path
 import sqlite3
-from typing import Iterable, Dict, Any, Tuple, List
+import threading
+import weakref
+from typing import Iterable, Iterator, Dict, Any, Optional, Tuple, List
 
 DB_PATH = Path(__file__).resolve().parent.parent / "data" / "pos.db"
+DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+_PRAGMAS = """
+PRAGMA journal_mode = WAL;
+PRAGMA synchronous = NORMAL;
+PRAGMA temp_store = MEMORY;
+PRAGMA mmap_size = 268435456;
+PRAGMA cache_size = -20000;
+PRAGMA foreign_keys = ON;
+PRAGMA busy_timeout = 5000;
+"""
+
+class _Connection(sqlite3.Connection):
+    # Subclase solo para poder registrar las conexiones con referencias débiles
+    pass
+
+
+# Una conexión abierta por hilo; las escrituras se serializan con un candado.
+_local = threading.local()
+_write_lock = threading.Lock()
+_open_conns: weakref.WeakSet[_Connection] = weakref.WeakSet()
+
+# Se desactiva en init_db si la versión de SQLite no trae FTS5 con trigramas
+_fts_enabled = True
+
+# Valores de settings ya leídos; None marca una clave que no existe
+_settings_cache: Dict[str, Optional[str]] = {}
+
+_HASH_ALGORITHM = "pbkdf2_sha256"
+_HASH_ITERATIONS = 600_000
+
+_Q_LIST_CATEGORIES = "SELECT id, name FROM categories ORDER BY name"
+_Q_LIST_BRANCHES = "SELECT id, name, address FROM branches ORDER BY name"
+_Q_LIST_CUSTOMERS = (
+    "SELECT id, name, phone, email, address FROM customers ORDER BY name"
+)
+_Q_LIST_SUPPLIERS = (
+    "SELECT id, name, phone, email, address FROM suppliers ORDER BY name"
+)
+_Q_LIST_EXPENSES = (
+    "SELECT id, created_at, concept, amount FROM expenses ORDER BY created_at DESC"
+)
+_Q_LIST_USERS = (
+    "SELECT id, username, display_name, role, is_active FROM users ORDER BY username"
+)
+_Q_UPSERT_PRODUCT = """
+    INSERT INTO products (barcode, name, price, stock) VALUES (?, ?, ?, ?)
+    ON CONFLICT(barcode) DO UPDATE SET
+        name = excluded.name, price = excluded.price, stock = excluded.stock
+"""
+
+# Consultas de reportes: el texto fijo permite reutilizar la sentencia preparada
+_Q_DAILY_SUMMARY = """
+    SELECT
+        p.barcode AS barcode,
+        p.name AS name,
+        SUM(si.quantity) AS quantity,
+        SUM(si.line_total) AS total,
+        SUM(SUM(si.line_total)) OVER () AS grand_total
+    FROM sale_items si
+    JOIN sales s ON s.id = si.sale_id
+    JOIN products p ON p.id = si.product_id
+    WHERE s.created_at >= ? AND s.created_at < ?
+    GROUP BY p.id, p.barcode, p.name
+    ORDER BY SUM(si.quantity) DESC, p.id
+"""
+
+_Q_DAILY_SUMMARY_PAGE = _Q_DAILY_SUMMARY + "    LIMIT ? OFFSET ?\n"
+
+_Q_DAY_SALE_ITEMS = """
+    SELECT
+        s.id AS sale_id,
+        s.subtotal AS subtotal,
+        s.discount AS discount,
+        s.total AS total,
+        p.name AS name,
+        substr(p.name, 1, 20) AS short_name,
+        si.quantity AS quantity,
+        si.price AS price,
+        si.line_total AS line_total
+    FROM sales s
+    JOIN sale_items si ON si.sale_id = s.id
+    JOIN products p ON p.id = si.product_id
+    WHERE s.created_at >= ? AND s.created_at < ?
+    ORDER BY s.id, si.id
+"""
+
+_Q_TOP_PRODUCTS = """
+    SELECT
+        p.barcode AS barcode,
+        p.name AS name,
+        SUM(si.quantity) AS quantity,
+        SUM(si.line_total) AS total
+    FROM sale_items si
+    JOIN products p ON p.id = si.product_id
+    GROUP BY p.id, p.barcode, p.name
+    ORDER BY SUM(si.quantity) DESC
+    LIMIT ?
+"""
+
+
+def _get_conn() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(
+            DB_PATH,
+            check_same_thread=False,
+            cached_statements=256,
+            factory=_Connection,
+            isolation_level=None,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.executescript(_PRAGMAS)
+        _open_conns.add(conn)
+        _local.conn = conn
+    return conn
 
 
-def _connect() -> sqlite3.Connection:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
-    return conn
+def _shutdown_conn(conn: sqlite3.Connection, optimize: bool) -> None:
+    # Una conexión ocupada o ya cerrada no impide cerrar las demás
+    try:
+        if optimize:
+            # SQLite recomienda optimize antes de cerrar para refrescar estadísticas
+            conn.execute("PRAGMA optimize")
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+
+@atexit.register
+def _close_all_conns() -> None:
+    # optimize solo en la conexión de este hilo; las de otros hilos solo se cierran
+    own = getattr(_local, "conn", None)
+    for conn in list(_open_conns):
+        _shutdown_conn(conn, optimize=conn is own)
+
+
+def optimize_database() -> None:
+    _get_conn().execute("PRAGMA optimize")
+
+
+@contextmanager
+def _writer() -> Iterator[sqlite3.Connection]:
+    with _write_lock:
+        conn = _get_conn()
+        with conn:
+            yield conn
+
+
+@contextmanager
+def _immediate_transaction() -> Iterator[sqlite3.Connection]:
+    # Toma el candado de escritura desde el inicio para no escalarlo a mitad
+    with _write_lock:
+        conn = _get_conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+def _query(sql: str, params: Tuple[Any, ...] = ()) -> List[sqlite3.Row]:
+    return _get_conn().execute(sql, params).fetchall()
+
+
+def _iter_rows(cursor: sqlite3.Cursor, size: int = 512) -> Iterator[sqlite3.Row]:
+    while rows := cursor.fetchmany(size):
+        yield from rows
+
+
+def _stock_delta_sql(count: int, sign: str) -> str:
+    # Aplica todos los movimientos de inventario en una sola sentencia
+    values = ", ".join(["(?, ?)"] * count)
+    return f"""
+        WITH deltas(pid, q) AS (VALUES {values})
+        UPDATE products
+        SET stock = stock {sign} (SELECT SUM(q) FROM deltas WHERE pid = products.id)
+        WHERE id IN (SELECT pid FROM deltas)
+    """
+
+
+def _ensure_products_fts(conn: sqlite3.Connection) -> bool:
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'products_fts'"
+    ).fetchone()
+    try:
+        conn.executescript(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+                barcode, name,
+                content='products', content_rowid='id', tokenize='trigram'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS products_ai AFTER INSERT ON products BEGIN
+                INSERT INTO products_fts (rowid, barcode, name)
+                VALUES (new.id, new.barcode, new.name);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS products_ad AFTER DELETE ON products BEGIN
+                INSERT INTO products_fts (products_fts, rowid, barcode, name)
+                VALUES ('delete', old.id, old.barcode, old.name);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS products_au AFTER UPDATE OF barcode, name ON products BEGIN
+                INSERT INTO products_fts (products_fts, rowid, barcode, name)
+                VALUES ('delete', old.id, old.barcode, old.name);
+                INSERT INTO products_fts (rowid, barcode, name)
+                VALUES (new.id, new.barcode, new.name);
+            END;
+            """
+        )
+    except sqlite3.OperationalError:
+        return False
+    if exists is None:
+        conn.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+    return True
 
 
 def init_db() -> None:
-    with _connect() as conn:
+    global _fts_enabled
+    with _writer() as conn:
         conn.executescript(
             """
             CREATE TABLE IF NOT EXISTS products (
@@ -117,32 +335,66 @@ def init_db() -> None:
                 name TEXT UNIQUE NOT NULL,
                 address TEXT
             );
+
+            CREATE INDEX IF NOT EXISTS idx_sale_items_sale_id ON sale_items(sale_id);
+            CREATE INDEX IF NOT EXISTS idx_sale_items_product_id ON sale_items(product_id);
+            CREATE INDEX IF NOT EXISTS idx_sales_created_at ON sales(created_at);
+            CREATE INDEX IF NOT EXISTS idx_purchase_items_purchase_id ON purchase_items(purchase_id);
+            CREATE INDEX IF NOT EXISTS idx_expenses_created_at ON expenses(created_at);
             """
         )
-        _ensure_column(conn, "sales", "subtotal", "REAL NOT NULL DEFAULT 0")
-        _ensure_column(conn, "sales", "discount", "REAL NOT NULL DEFAULT 0")
-        _ensure_column(conn, "sales", "tax_rate", "REAL NOT NULL DEFAULT 0")
-        _ensure_column(conn, "sales", "tax_amount", "REAL NOT NULL DEFAULT 0")
-        _ensure_column(conn, "users", "role", "TEXT NOT NULL DEFAULT 'Administrador'")
+        _fts_enabled = _ensure_products_fts(conn)
+        _ensure_columns(
+            conn,
+            "sales",
+            [
+                ("subtotal", "REAL NOT NULL DEFAULT 0"),
+                ("discount", "REAL NOT NULL DEFAULT 0"),
+                ("tax_rate", "REAL NOT NULL DEFAULT 0"),
+                ("tax_amount", "REAL NOT NULL DEFAULT 0"),
+            ],
+        )
+        _ensure_columns(
+            conn, "users", [("role", "TEXT NOT NULL DEFAULT 'Administrador'")]
+        )
         conn.commit()
+        conn.execute("PRAGMA optimize")
 
 
-def _ensure_column(conn: sqlite3.Connection, table: str, column: str, ddl: str) -> None:
+def _ensure_columns(
+    conn: sqlite3.Connection, table: str, specs: Iterable[Tuple[str, str]]
+) -> None:
     existing = {
         row["name"] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()
     }
-    if column not in existing:
-        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+    for column, ddl in specs:
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+            existing.add(column)
+
+
+def _hash_password(
+    password: str, salt: str | None = None, iterations: int = _HASH_ITERATIONS
+) -> str:
+    salt = salt or secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac(
+        "sha256", password.encode("utf-8"), salt.encode("ascii"), iterations
+    ).hex()
+    return f"{_HASH_ALGORITHM}${iterations}${salt}${digest}"
 
 
-def _hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode("utf-8")).hexdigest()
+def _check_password(password: str, stored: str) -> bool:
+    if stored.startswith(f"{_HASH_ALGORITHM}$"):
+        _, iterations, salt, _ = stored.split("$")
+        return hmac.compare_digest(stored, _hash_password(password, salt, int(iterations)))
+    # Hash heredado: SHA-256 sin sal
+    legacy = hashlib.sha256(password.encode("utf-8")).hexdigest()
+    return hmac.compare_digest(stored, legacy)
 
 
 def ensure_default_user() -> None:
-    with _connect() as conn:
-        count = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
-        if count > 0:
+    with _writer() as conn:
+        if conn.execute("SELECT EXISTS (SELECT 1 FROM users)").fetchone()[0]:
             return
 
         conn.execute(
@@ -156,9 +408,8 @@ def ensure_default_user() -> None:
 
 
 def seed_sample_data() -> None:
-    with _connect() as conn:
-        count = conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
-        if count > 0:
+    with _writer() as conn:
+        if conn.execute("SELECT EXISTS (SELECT 1 FROM products)").fetchone()[0]:
             return
 
         products = [
@@ -176,27 +427,37 @@ def seed_sample_data() -> None:
 
 
 def verify_user(username: str, password: str) -> bool:
-    with _connect() as conn:
-        row = conn.execute(
-            "SELECT password_hash, is_active FROM users WHERE username = ?",
-            (username,),
-        ).fetchone()
-        if row is None or row["is_active"] != 1:
-            return False
-        return row["password_hash"] == _hash_password(password)
+    conn = _get_conn()
+    row = conn.execute(
+        "SELECT id, password_hash FROM users"
+        " WHERE username = ? AND is_active = 1 LIMIT 1",
+        (username,),
+    ).fetchone()
+    if row is None or not _check_password(password, row["password_hash"]):
+        return False
+    if not row["password_hash"].startswith(f"{_HASH_ALGORITHM}$"):
+        # El hash tarda; se calcula antes de tomar el candado de escritura
+        password_hash = _hash_password(password)
+        with _writer() as conn:
+            conn.execute(
+                "UPDATE users SET password_hash = ? WHERE id = ?",
+                (password_hash, row["id"]),
+            )
+            conn.commit()
+    return True
 
 
 def get_product_by_barcode(barcode: str) -> sqlite3.Row | None:
-    with _connect() as conn:
-        return conn.execute(
-            "SELECT id, barcode, name, price, stock FROM products WHERE barcode = ?",
-            (barcode,),
-        ).fetchone()
+    conn = _get_conn()
+    return conn.execute(
+        "SELECT id, barcode, name, price, stock FROM products WHERE barcode = ?",
+        (barcode,),
+    ).fetchone()
 
 
 def add_product(barcode: str, name: str, price: float, stock: float) -> bool:
     try:
-        with _connect() as conn:
+        with _writer() as conn:
             conn.execute(
                 "INSERT INTO products (barcode, name, price, stock) VALUES (?, ?, ?, ?)",
                 (barcode, name, price, stock),
@@ -207,39 +468,74 @@ def add_product(barcode: str, name: str, price: float, stock: float) -> bool:
         return False
 
 
-def list_products(search: str = "") -> List[sqlite3.Row]:
-    query = ""
-    params: Tuple[Any, ...] = ()
+# Filas livianas para el inventario: acceso por atributo sin buscar columnas por nombre
+ProductRow = namedtuple("ProductRow", "id barcode name price stock")
+
+
+def _product_row(cursor: sqlite3.Cursor, row: tuple) -> ProductRow:
+    return ProductRow._make(row)
+
+
+def _product_filter(search: str) -> Tuple[str, Tuple[Any, ...]]:
+    if search and _fts_enabled and len(search) >= 3:
+        # El tokenizador trigram necesita al menos 3 caracteres
+        return (
+            "JOIN products_fts ON products_fts.rowid = p.id "
+            "WHERE products_fts MATCH ?",
+            ('"' + search.replace('"', '""') + '"',),
+        )
     if search:
-        query = "WHERE barcode LIKE ? OR name LIKE ?"
         like = f"%{search}%"
-        params = (like, like)
-
-    with _connect() as conn:
-        return conn.execute(
+        return "WHERE p.barcode LIKE ? OR p.name LIKE ?", (like, like)
+    return "", ()
+
+
+def count_products(search: str = "") -> int:
+    query, params = _product_filter(search)
+    conn = _get_conn()
+    return conn.execute(
+        f"SELECT COUNT(*) FROM products p {query}", params
+    ).fetchone()[0]
+
+
+def list_products(
+    search: str = "", limit: int | None = None, offset: int = 0
+) -> Iterator[ProductRow]:
+    query, params = _product_filter(search)
+    page = ""
+    if limit is not None:
+        page = "LIMIT ? OFFSET ?"
+        params += (limit, offset)
+
+    cursor = _get_conn().cursor()
+    cursor.row_factory = _product_row
+    return _iter_rows(
+        cursor.execute(
             f"""
-            SELECT id, barcode, name, price, stock
-            FROM products
+            SELECT p.id, p.barcode, p.name, p.price, p.stock
+            FROM products p
             {query}
-            ORDER BY name ASC
+            ORDER BY p.name ASC, p.id ASC
+            {page}
             """,
             params,
-        ).fetchall()
+        )
+    )
 
 
 def get_product_by_id(product_id: int) -> sqlite3.Row | None:
-    with _connect() as conn:
-        return conn.execute(
-            "SELECT id, barcode, name, price, stock FROM products WHERE id = ?",
-            (product_id,),
-        ).fetchone()
+    conn = _get_conn()
+    return conn.execute(
+        "SELECT id, barcode, name, price, stock FROM products WHERE id = ?",
+        (product_id,),
+    ).fetchone()
 
 
 def update_product(
     product_id: int, barcode: str, name: str, price: float, stock: float
 ) -> bool:
     try:
-        with _connect() as conn:
+        with _writer() as conn:
             conn.execute(
                 """
                 UPDATE products
@@ -254,8 +550,14 @@ def update_product(
         return False
 
 
+def bulk_upsert_products(rows: Iterable[Tuple[str, str, float, float]]) -> None:
+    # Filas (barcode, name, price, stock); todo el lote en una sola transacción
+    with _immediate_transaction() as conn:
+        conn.executemany(_Q_UPSERT_PRODUCT, rows)
+
+
 def delete_product(product_id: int) -> None:
-    with _connect() as conn:
+    with _writer() as conn:
         conn.execute("DELETE FROM products WHERE id = ?", (product_id,))
         conn.commit()
 
@@ -269,22 +571,23 @@ def record_sale(
     if not items_list:
         raise ValueError("No hay artículos en la venta")
 
-    subtotal = sum(item["line_total"] for item in items_list)
+    subtotal = math.fsum([item["line_total"] for item in items_list])
     discount = max(0.0, float(discount))
     taxable = max(0.0, subtotal - discount)
     tax_amount = taxable * float(tax_rate)
     total = taxable + tax_amount
     created_at = datetime.now().isoformat(sep=" ", timespec="seconds")
 
-    with _connect() as conn:
+    with _immediate_transaction() as conn:
         cur = conn.execute(
             """
             INSERT INTO sales (created_at, subtotal, discount, tax_rate, tax_amount, total)
             VALUES (?, ?, ?, ?, ?, ?)
+            RETURNING id
             """,
             (created_at, subtotal, discount, tax_rate, tax_amount, total),
         )
-        sale_id = cur.lastrowid
+        sale_id = cur.fetchone()[0]
 
         conn.executemany(
             """
@@ -303,44 +606,45 @@ def record_sale(
             ],
         )
 
-        for item in items_list:
-            conn.execute(
-                "UPDATE products SET stock = stock - ? WHERE id = ?",
-                (item["quantity"], item["product_id"]),
-            )
-
-        conn.commit()
+        conn.execute(
+            _stock_delta_sql(len(items_list), "-"),
+            [
+                value
+                for item in items_list
+                for value in (item["product_id"], item["quantity"])
+            ],
+        )
 
     return sale_id, total
 
 
 def get_setting(key: str, default: str = "") -> str:
-    with _connect() as conn:
+    try:
+        value = _settings_cache[key]
+    except KeyError:
+        conn = _get_conn()
         row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
-        if row is None:
-            return default
-        return row["value"]
+        value = _settings_cache[key] = None if row is None else row["value"]
+    return default if value is None else value
 
 
 def set_setting(key: str, value: str) -> None:
-    with _connect() as conn:
+    with _writer() as conn:
         conn.execute(
             "INSERT INTO settings (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
             (key, value),
         )
         conn.commit()
+    _settings_cache[key] = value
 
 
 def list_categories() -> List[sqlite3.Row]:
-    with _connect() as conn:
-        return conn.execute(
-            "SELECT id, name FROM categories ORDER BY name"
-        ).fetchall()
+    return _query(_Q_LIST_CATEGORIES)
 
 
 def add_category(name: str) -> bool:
     try:
-        with _connect() as conn:
+        with _writer() as conn:
             conn.execute("INSERT INTO categories (name) VALUES (?)", (name,))
             conn.commit()
         return True
@@ -349,21 +653,18 @@ def add_category(name: str) -> bool:
 
 
 def delete_category(category_id: int) -> None:
-    with _connect() as conn:
+    with _writer() as conn:
         conn.execute("DELETE FROM categories WHERE id = ?", (category_id,))
         conn.commit()
 
 
 def list_branches() -> List[sqlite3.Row]:
-    with _connect() as conn:
-        return conn.execute(
-            "SELECT id, name, address FROM branches ORDER BY name"
-        ).fetchall()
+    return _query(_Q_LIST_BRANCHES)
 
 
 def add_branch(name: str, address: str) -> bool:
     try:
-        with _connect() as conn:
+        with _writer() as conn:
             conn.execute(
                 "INSERT INTO branches (name, address) VALUES (?, ?)",
                 (name, address),
@@ -375,20 +676,17 @@ def add_branch(name: str, address: str) -> bool:
 
 
 def delete_branch(branch_id: int) -> None:
-    with _connect() as conn:
+    with _writer() as conn:
         conn.execute("DELETE FROM branches WHERE id = ?", (branch_id,))
         conn.commit()
 
 
 def list_customers() -> List[sqlite3.Row]:
-    with _connect() as conn:
-        return conn.execute(
-            "SELECT id, name, phone, email, address FROM customers ORDER BY name"
-        ).fetchall()
+    return _query(_Q_LIST_CUSTOMERS)
 
 
 def add_customer(name: str, phone: str, email: str, address: str) -> None:
-    with _connect() as conn:
+    with _writer() as conn:
         conn.execute(
             "INSERT INTO customers (name, phone, email, address) VALUES (?, ?, ?, ?)",
             (name, phone, email, address),
@@ -399,7 +697,7 @@ def add_customer(name: str, phone: str, email: str, address: str) -> None:
 def update_customer(
     customer_id: int, name: str, phone: str, email: str, address: str
 ) -> None:
-    with _connect() as conn:
+    with _writer() as conn:
         conn.execute(
             """
             UPDATE customers SET name = ?, phone = ?, email = ?, address = ?
@@ -411,20 +709,17 @@ def update_customer(
 
 
 def delete_customer(customer_id: int) -> None:
-    with _connect() as conn:
+    with _writer() as conn:
         conn.execute("DELETE FROM customers WHERE id = ?", (customer_id,))
         conn.commit()
 
 
 def list_suppliers() -> List[sqlite3.Row]:
-    with _connect() as conn:
-        return conn.execute(
-            "SELECT id, name, phone, email, address FROM suppliers ORDER BY name"
-        ).fetchall()
+    return _query(_Q_LIST_SUPPLIERS)
 
 
 def add_supplier(name: str, phone: str, email: str, address: str) -> None:
-    with _connect() as conn:
+    with _writer() as conn:
         conn.execute(
             "INSERT INTO suppliers (name, phone, email, address) VALUES (?, ?, ?, ?)",
             (name, phone, email, address),
@@ -435,7 +730,7 @@ def add_supplier(name: str, phone: str, email: str, address: str) -> None:
 def update_supplier(
     supplier_id: int, name: str, phone: str, email: str, address: str
 ) -> None:
-    with _connect() as conn:
+    with _writer() as conn:
         conn.execute(
             """
             UPDATE suppliers SET name = ?, phone = ?, email = ?, address = ?
@@ -447,21 +742,18 @@ def update_supplier(
 
 
 def delete_supplier(supplier_id: int) -> None:
-    with _connect() as conn:
+    with _writer() as conn:
         conn.execute("DELETE FROM suppliers WHERE id = ?", (supplier_id,))
         conn.commit()
 
 
 def list_expenses() -> List[sqlite3.Row]:
-    with _connect() as conn:
-        return conn.execute(
-            "SELECT id, created_at, concept, amount FROM expenses ORDER BY created_at DESC"
-        ).fetchall()
+    return _query(_Q_LIST_EXPENSES)
 
 
 def add_expense(concept: str, amount: float) -> None:
     created_at = datetime.now().isoformat(sep=" ", timespec="seconds")
-    with _connect() as conn:
+    with _writer() as conn:
         conn.execute(
             "INSERT INTO expenses (created_at, concept, amount) VALUES (?, ?, ?)",
             (created_at, concept, amount),
@@ -470,27 +762,26 @@ def add_expense(concept: str, amount: float) -> None:
 
 
 def delete_expense(expense_id: int) -> None:
-    with _connect() as conn:
+    with _writer() as conn:
         conn.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
         conn.commit()
 
 
 def list_users() -> List[sqlite3.Row]:
-    with _connect() as conn:
-        return conn.execute(
-            "SELECT id, username, display_name, role, is_active FROM users ORDER BY username"
-        ).fetchall()
+    return _query(_Q_LIST_USERS)
 
 
 def add_user(username: str, password: str, display_name: str, role: str) -> bool:
+    # El hash tarda; se calcula antes de tomar el candado de escritura
+    password_hash = _hash_password(password)
     try:
-        with _connect() as conn:
+        with _writer() as conn:
             conn.execute(
                 """
                 INSERT INTO users (username, password_hash, display_name, role)
                 VALUES (?, ?, ?, ?)
                 """,
-                (username, _hash_password(password), display_name, role),
+                (username, password_hash, display_name, role),
             )
             conn.commit()
         return True
@@ -501,16 +792,18 @@ def add_user(username: str, password: str, display_name: str, role: str) -> bool
 def update_user(
     user_id: int, username: str, password: str | None, display_name: str, role: str, is_active: bool
 ) -> bool:
+    # El hash tarda; se calcula antes de tomar el candado de escritura
+    password_hash = _hash_password(password) if password else None
     try:
-        with _connect() as conn:
-            if password:
+        with _writer() as conn:
+            if password_hash:
                 conn.execute(
                     """
                     UPDATE users
                     SET username = ?, password_hash = ?, display_name = ?, role = ?, is_active = ?
                     WHERE id = ?
                     """,
-                    (username, _hash_password(password), display_name, role, int(is_active), user_id),
+                    (username, password_hash, display_name, role, int(is_active), user_id),
                 )
             else:
                 conn.execute(
@@ -528,7 +821,7 @@ def update_user(
 
 
 def delete_user(user_id: int) -> None:
-    with _connect() as conn:
+    with _writer() as conn:
         conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
         conn.commit()
 
@@ -541,22 +834,26 @@ def record_purchase(
     if not items_list:
         raise ValueError("No hay artículos en la compra")
 
-    total = sum(item["line_total"] for item in items_list)
+    total = math.fsum([item["line_total"] for item in items_list])
     created_at = datetime.now().isoformat(sep=" ", timespec="seconds")
 
-    with _connect() as conn:
+    with _immediate_transaction() as conn:
         cur = conn.execute(
-            "INSERT INTO purchases (created_at, supplier_id, total) VALUES (?, ?, ?)",
+            """
+            INSERT INTO purchases (created_at, supplier_id, total)
+            VALUES (?, ?, ?)
+            RETURNING id
+            """,
             (created_at, supplier_id, total),
         )
-        purchase_id = cur.lastrowid
+        purchase_id = cur.fetchone()[0]
 
         conn.executemany(
             """
             INSERT INTO purchase_items (purchase_id, product_id, quantity, cost, line_total)
             VALUES (?, ?, ?, ?, ?)
             """,
-            [
+            (
                 (
                     purchase_id,
                     item["product_id"],
@@ -565,91 +862,95 @@ def record_purchase(
                     item["line_total"],
                 )
                 for item in items_list
-            ],
+            ),
         )
 
-        for item in items_list:
-            conn.execute(
-                "UPDATE products SET stock = stock + ? WHERE id = ?",
-                (item["quantity"], item["product_id"]),
-            )
-
-        conn.commit()
+        conn.execute(
+            _stock_delta_sql(len(items_list), "+"),
+            [
+                value
+                for item in items_list
+                for value in (item["product_id"], item["quantity"])
+            ],
+        )
 
     return purchase_id, total
 
 
 def backup_database(backup_path: Path) -> None:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy2(DB_PATH, backup_path)
+    # API de respaldo en línea: copia consistente aun con WAL y escrituras activas
+    target = sqlite3.connect(backup_path)
+    try:
+        _get_conn().backup(target, pages=1024)
+    finally:
+        target.close()
 
 
 def restore_database(backup_path: Path) -> None:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy2(backup_path, DB_PATH)
+    source = sqlite3.connect(backup_path)
+    try:
+        with _write_lock:
+            conn = _get_conn()
+            source.backup(conn, pages=1024)
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        source.close()
+    _settings_cache.clear()
+    # Un respaldo anterior puede no tener el índice de búsqueda o columnas nuevas
+    init_db()
 
 
 def clear_transactions() -> None:
-    with _connect() as conn:
+    with _writer() as conn:
         conn.executescript(
             """
+            BEGIN;
             DELETE FROM sale_items;
             DELETE FROM sales;
             DELETE FROM purchase_items;
             DELETE FROM purchases;
             DELETE FROM expenses;
+            COMMIT;
             """
         )
         conn.commit()
 
 
+def _day_bounds(target_date: str) -> Tuple[str, str]:
+    # Rango [día, día siguiente) para que el índice de created_at sea utilizable
+    day = date.fromisoformat(target_date[:10])
+    return day.isoformat(), (day + timedelta(days=1)).isoformat()
+
+
 def get_daily_sales_summary(target_date: str) -> List[sqlite3.Row]:
-    with _connect() as conn:
-        return conn.execute(
-            """
-            SELECT
-                p.barcode AS barcode,
-                p.name AS name,
-                SUM(si.quantity) AS quantity,
-                SUM(si.line_total) AS total
-            FROM sale_items si
-            JOIN sales s ON s.id = si.sale_id
-            JOIN products p ON p.id = si.product_id
-            WHERE DATE(s.created_at) = DATE(?)
-            GROUP BY p.id, p.barcode, p.name
-            ORDER BY SUM(si.quantity) DESC
-            """,
-            (target_date,),
-        ).fetchall()
+    return _query(_Q_DAILY_SUMMARY, _day_bounds(target_date))
+
+
+def get_day_sale_items(target_date: str) -> List[sqlite3.Row]:
+    # Renglones de todas las ventas del día en una consulta, ordenados por venta
+    return _query(_Q_DAY_SALE_ITEMS, _day_bounds(target_date))
+
+
+def get_daily_sales_summary_page(
+    target_date: str, offset: int, limit: int
+) -> List[sqlite3.Row]:
+    return _query(_Q_DAILY_SUMMARY_PAGE, _day_bounds(target_date) + (limit, offset))
 
 
 def get_top_products(limit: int = 20) -> List[sqlite3.Row]:
-    with _connect() as conn:
-        return conn.execute(
-            """
-            SELECT
-                p.barcode AS barcode,
-                p.name AS name,
-                SUM(si.quantity) AS quantity,
-                SUM(si.line_total) AS total
-            FROM sale_items si
-            JOIN products p ON p.id = si.product_id
-            GROUP BY p.id, p.barcode, p.name
-            ORDER BY SUM(si.quantity) DESC
-            LIMIT ?
-            """,
-            (limit,),
-        ).fetchall()
+    return _query(_Q_TOP_PRODUCTS, (limit,))
 
 
-def list_sales_for_date(target_date: str) -> List[sqlite3.Row]:
-    with _connect() as conn:
-        return conn.execute(
+def list_sales_for_date(target_date: str) -> Iterator[sqlite3.Row]:
+    conn = _get_conn()
+    return _iter_rows(
+        conn.execute(
             """
             SELECT id, created_at, subtotal, discount, tax_rate, tax_amount, total
             FROM sales
-            WHERE DATE(created_at) = DATE(?)
+            WHERE created_at >= ? AND created_at < ?
             ORDER BY created_at
             """,
-            (target_date,),
-        ).fetchall()
+            _day_bounds(target_date),
+        )
+    )
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+from array import array
+import csv
 import sys
+from contextlib import contextmanager
+import functools
+import itertools
+import zipfile
 from pathlib import Path
-from typing import Dict, Any
-
-import pandas as pd
-from reportlab.lib.units import mm
-from reportlab.pdfgen import canvas
+from typing import Dict, Any, Iterable, Iterator, Mapping
 
 from PySide6 import QtCore, QtGui, QtWidgets
 
@@ -60,6 +62,12 @@ try:
         add_branch,
         delete_branch,
         clear_transactions,
+        optimize_database,
+        count_products,
+        get_daily_sales_summary_page,
+        bulk_upsert_products,
+        ProductRow,
+        get_day_sale_items,
     )
 except ImportError:
     from app.db import (
@@ -104,20 +112,158 @@ except ImportError:
         add_branch,
         delete_branch,
         clear_transactions,
+        optimize_database,
+        count_products,
+        get_daily_sales_summary_page,
+        bulk_upsert_products,
+        ProductRow,
+        get_day_sale_items,
     )
 
 
+# pandas tarda en importarse; se carga al primer import/export que lo use
+_pd = None
+
+
+def _get_pd():
+    global _pd
+    if _pd is None:
+        import pandas as pd
+
+        _pd = pd
+    return _pd
+
+
+_CURRENCY_SYMBOL: str | None = None
+
+
+def _load_currency_symbol() -> str:
+    global _CURRENCY_SYMBOL
+    _CURRENCY_SYMBOL = get_setting("currency_symbol", "$")
+    return _CURRENCY_SYMBOL
+
+
 def get_currency_symbol() -> str:
-    return get_setting("currency_symbol", "$")
+    return _CURRENCY_SYMBOL if _CURRENCY_SYMBOL is not None else _load_currency_symbol()
+
+
+def invalidate_currency_symbol() -> None:
+    global _CURRENCY_SYMBOL
+    _CURRENCY_SYMBOL = None
+    _format_cents.cache_clear()
+
+
+# Formateador ya ligado; en ciclos largos se llama directo con el símbolo resuelto
+_FMT = "{} {:,.2f}".format
+
+
+@functools.lru_cache(maxsize=8192)
+def _format_cents(cents: int) -> str:
+    return _FMT(get_currency_symbol(), cents / 100)
+
+
+def _to_cents(value: float) -> int:
+    return round(value * 100)
 
 
 def format_money(value: float) -> str:
-    return f"{get_currency_symbol()} {value:,.2f}"
+    # La llave en centavos evita que 0.1 + 0.2 y 0.3 ocupen entradas distintas
+    return _format_cents(_to_cents(value))
+
+
+@functools.lru_cache(maxsize=4096)
+def _product_cache(barcode: str) -> Any:
+    # Escaneos repetidos sin ir a SQLite; se limpia al escribir productos
+    return get_product_by_barcode(barcode)
+
+
+def _g(row: Mapping[str, Any], key: str, default: Any = None) -> Any:
+    # sqlite3.Row no tiene .get; se lee directo sin copiarla a un dict
+    try:
+        return row[key]
+    except (KeyError, IndexError):
+        return default
+
+
+@contextmanager
+def _batched_fill(view: QtWidgets.QAbstractItemView) -> Iterator[None]:
+    # Evita repintar, ordenar y recalcular columnas por cada celda insertada
+    view.setUpdatesEnabled(False)
+    view.blockSignals(True)
+    sorting = isinstance(view, QtWidgets.QTableView) and view.isSortingEnabled()
+    header = view.horizontalHeader() if isinstance(view, QtWidgets.QTableView) else None
+    modes = []
+    if header is not None:
+        if sorting:
+            view.setSortingEnabled(False)
+        modes = [header.sectionResizeMode(i) for i in range(header.count())]
+        header.setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+    try:
+        yield
+    finally:
+        if header is not None:
+            for index, mode in enumerate(modes):
+                header.setSectionResizeMode(index, mode)
+            if sorting:
+                view.setSortingEnabled(True)
+        view.blockSignals(False)
+        view.setUpdatesEnabled(True)
+        view.viewport().update()
+
+
+def _fill_table(
+    table: QtWidgets.QTableWidget,
+    cells: list[tuple[str, ...]],
+    ids: list[int] | None = None,
+) -> None:
+    # Reutiliza los QTableWidgetItem existentes; solo crea los de filas nuevas
+    with _batched_fill(table):
+        table.setRowCount(len(cells))
+        for row_index, values in enumerate(cells):
+            for column, text in enumerate(values):
+                item = table.item(row_index, column)
+                if item is None:
+                    item = QtWidgets.QTableWidgetItem(text)
+                    table.setItem(row_index, column, item)
+                else:
+                    item.setText(text)
+            if ids is not None:
+                table.item(row_index, 0).setData(QtCore.Qt.UserRole, ids[row_index])
+
+
+class WorkerSignals(QtCore.QObject):
+    result = QtCore.Signal(object)
+    error = QtCore.Signal(str)
+
+
+class DbWorker(QtCore.QRunnable):
+    # Corre una función de app.db en el QThreadPool; cada hilo abre su propia conexión
+    def __init__(self, fn: Any, *args: Any) -> None:
+        super().__init__()
+        # Python conserva la referencia hasta que llega el resultado
+        self.setAutoDelete(False)
+        self.signals = WorkerSignals()
+        self._fn = fn
+        self._args = args
+
+    def run(self) -> None:
+        try:
+            result = self._fn(*self._args)
+        except Exception as exc:  # noqa: BLE001
+            self.signals.error.emit(str(exc))
+        else:
+            self.signals.result.emit(result)
+
+    def start(self) -> "DbWorker":
+        QtCore.QThreadPool.globalInstance().start(self)
+        return self
 
 
 class LoginDialog(QtWidgets.QDialog):
     def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
         super().__init__(parent)
+        # Su estilo vive en _APP_QSS bajo QDialog#loginDialog
+        self.setObjectName("loginDialog")
         self.setWindowTitle("Inicio de sesión")
         self.setFixedSize(500, 320)
         self.setWindowFlag(QtCore.Qt.WindowContextHelpButtonHint, False)
@@ -154,23 +300,6 @@ class LoginDialog(QtWidgets.QDialog):
         layout.addWidget(self.status_label)
         layout.addWidget(self.login_button)
 
-        self.setStyleSheet(
-            """
-            QDialog { background-color: #f5f7fb; }
-            #card { background: white; border-radius: 12px; padding: 12px; }
-            QLineEdit {
-                padding: 8px; border: 1px solid #d0d7de; border-radius: 8px;
-                background: #ffffff; font-size: 12pt;
-            }
-            QPushButton {
-                padding: 10px; border: none; border-radius: 8px;
-                background: #2d6cdf; color: white; font-weight: bold;
-            }
-            QPushButton:hover { background: #2458b7; }
-            QLabel { color: #1f2a44; }
-            """
-        )
-
         self.username_input.setFocus()
 
     def try_login(self) -> None:
@@ -180,72 +309,65 @@ class LoginDialog(QtWidgets.QDialog):
             self.status_label.setText("Ingresa usuario y contraseña")
             return
 
-        if verify_user(username, password):
+        self.login_button.setEnabled(False)
+        self.status_label.setText("")
+        # El hash PBKDF2 tarda; se verifica fuera del hilo de la interfaz
+        self._login_job = DbWorker(verify_user, username, password)
+        self._login_job.signals.result.connect(self._on_login_done)
+        self._login_job.signals.error.connect(self._on_login_error)
+        self._login_job.start()
+
+    def _on_login_done(self, ok: bool) -> None:
+        self._login_job = None
+        self.login_button.setEnabled(True)
+        if ok:
             self.accept()
         else:
             self.status_label.setText("Credenciales inválidas")
 
+    def _on_login_error(self, message: str) -> None:
+        self._login_job = None
+        self.login_button.setEnabled(True)
+        self.status_label.setText(message)
 
-class AddProductDialog(QtWidgets.QDialog):
-    def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
-        super().__init__(parent)
-        self.setWindowTitle("Nuevo producto")
-        self.setMinimumWidth(360)
 
-        self.barcode_input = QtWidgets.QLineEdit()
-        self.name_input = QtWidgets.QLineEdit()
-        self.price_input = QtWidgets.QDoubleSpinBox()
-        self.price_input.setMaximum(999999)
-        self.price_input.setDecimals(2)
-        self.stock_input = QtWidgets.QDoubleSpinBox()
-        self.stock_input.setMaximum(999999)
-        self.stock_input.setDecimals(2)
+_MISSING = object()
 
-        form = QtWidgets.QFormLayout()
-        form.addRow("Código de barras", self.barcode_input)
-        form.addRow("Nombre", self.name_input)
-        form.addRow("Precio", self.price_input)
-        form.addRow("Stock", self.stock_input)
 
-        buttons = QtWidgets.QDialogButtonBox(
-            QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel
-        )
-        buttons.accepted.connect(self.accept)
-        buttons.rejected.connect(self.reject)
+def _read(widget: QtWidgets.QLineEdit) -> str:
+    return widget.text().strip()
 
-        layout = QtWidgets.QVBoxLayout(self)
-        layout.addLayout(form)
-        layout.addWidget(buttons)
 
-    def get_values(self) -> Dict[str, Any]:
-        return {
-            "barcode": self.barcode_input.text().strip(),
-            "name": self.name_input.text().strip(),
-            "price": float(self.price_input.value()),
-            "stock": float(self.stock_input.value()),
-        }
+# Lector de valor por clase de widget, resuelto una vez por campo
+_READERS = {
+    QtWidgets.QLineEdit: _read,
+    QtWidgets.QDoubleSpinBox: QtWidgets.QDoubleSpinBox.value,
+    QtWidgets.QComboBox: QtWidgets.QComboBox.currentText,
+    QtWidgets.QCheckBox: QtWidgets.QCheckBox.isChecked,
+}
 
 
-class ProductDialog(QtWidgets.QDialog):
+class _SchemaDialog(QtWidgets.QDialog):
+    """Formulario Aceptar/Cancelar armado a partir de FIELDS."""
+
+    MIN_WIDTH = 380
+    # (clave, etiqueta, clase del widget, propiedades Qt del constructor)
+    FIELDS: list[tuple[str, str, type, Dict[str, Any]]] = []
+
     def __init__(self, title: str, parent: QtWidgets.QWidget | None = None) -> None:
         super().__init__(parent)
         self.setWindowTitle(title)
-        self.setMinimumWidth(380)
-
-        self.barcode_input = QtWidgets.QLineEdit()
-        self.name_input = QtWidgets.QLineEdit()
-        self.price_input = QtWidgets.QDoubleSpinBox()
-        self.price_input.setMaximum(999999)
-        self.price_input.setDecimals(2)
-        self.stock_input = QtWidgets.QDoubleSpinBox()
-        self.stock_input.setMaximum(999999)
-        self.stock_input.setDecimals(2)
+        self.setMinimumWidth(self.MIN_WIDTH)
 
         form = QtWidgets.QFormLayout()
-        form.addRow("Código de barras", self.barcode_input)
-        form.addRow("Nombre", self.name_input)
-        form.addRow("Precio", self.price_input)
-        form.addRow("Stock", self.stock_input)
+        for key, label, widget_class, props in self.FIELDS:
+            props = dict(props)
+            items = props.pop("items", None)
+            widget = widget_class(**props)
+            if items:
+                widget.addItems(items)
+            setattr(self, f"{key}_input", widget)
+            form.addRow(label, widget)
 
         buttons = QtWidgets.QDialogButtonBox(
             QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel
@@ -257,21 +379,49 @@ class ProductDialog(QtWidgets.QDialog):
         layout.addLayout(form)
         layout.addWidget(buttons)
 
-    def set_values(self, values: Dict[str, Any]) -> None:
-        self.barcode_input.setText(values.get("barcode", ""))
-        self.name_input.setText(values.get("name", ""))
-        self.price_input.setValue(float(values.get("price", 0)))
-        self.stock_input.setValue(float(values.get("stock", 0)))
+    def set_values(self, values: Mapping[str, Any]) -> None:
+        for key, _label, _widget_class, _props in self.FIELDS:
+            value = _g(values, key, _MISSING)
+            if value is _MISSING:
+                continue
+            widget = getattr(self, f"{key}_input")
+            if isinstance(widget, QtWidgets.QLineEdit):
+                widget.setText(value or "")
+            elif isinstance(widget, QtWidgets.QDoubleSpinBox):
+                widget.setValue(value or 0.0)
+            elif isinstance(widget, QtWidgets.QComboBox):
+                index = widget.findText(value)
+                if index >= 0:
+                    widget.setCurrentIndex(index)
+            elif isinstance(widget, QtWidgets.QCheckBox):
+                widget.setChecked(bool(value))
 
     def get_values(self) -> Dict[str, Any]:
         return {
-            "barcode": self.barcode_input.text().strip(),
-            "name": self.name_input.text().strip(),
-            "price": float(self.price_input.value()),
-            "stock": float(self.stock_input.value()),
+            key: _READERS[widget_class](getattr(self, f"{key}_input"))
+            for key, _label, widget_class, _props in self.FIELDS
         }
 
 
+_AMOUNT = {"maximum": 999999, "decimals": 2}
+
+
+class ProductDialog(_SchemaDialog):
+    FIELDS = [
+        ("barcode", "Código de barras", QtWidgets.QLineEdit, {}),
+        ("name", "Nombre", QtWidgets.QLineEdit, {}),
+        ("price", "Precio", QtWidgets.QDoubleSpinBox, _AMOUNT),
+        ("stock", "Stock", QtWidgets.QDoubleSpinBox, _AMOUNT),
+    ]
+
+
+class AddProductDialog(ProductDialog):
+    MIN_WIDTH = 360
+
+    def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
+        super().__init__("Nuevo producto", parent)
+
+
 class DailyReportDialog(QtWidgets.QDialog):
     def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
         super().__init__(parent)
@@ -283,14 +433,9 @@ class DailyReportDialog(QtWidgets.QDialog):
         self.refresh_button = QtWidgets.QPushButton("Actualizar")
         self.refresh_button.clicked.connect(self.load_data)
 
-        self.table = QtWidgets.QTableWidget(0, 4)
-        self.table.setHorizontalHeaderLabels(
-            ["Código", "Producto", "Cantidad", "Total"]
-        )
-        self.table.horizontalHeader().setStretchLastSection(True)
-        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
-        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
-        self.table.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        # La vista solo pinta las filas visibles y el modelo las pide por páginas
+        self.model = PagedRowsModel(_SUMMARY_COLUMNS, self)
+        self.table = _rows_table(self.model)
 
         self.total_label = QtWidgets.QLabel(format_money(0))
         total_font = QtGui.QFont()
@@ -318,22 +463,206 @@ class DailyReportDialog(QtWidgets.QDialog):
 
     def load_data(self) -> None:
         date_str = self.date_input.date().toString("yyyy-MM-dd")
-        rows = get_daily_sales_summary(date_str)
-        self.table.setRowCount(len(rows))
-
-        total = 0.0
-        for row_index, row in enumerate(rows):
-            self.table.setItem(row_index, 0, QtWidgets.QTableWidgetItem(row["barcode"]))
-            self.table.setItem(row_index, 1, QtWidgets.QTableWidgetItem(row["name"]))
-            self.table.setItem(
-                row_index, 2, QtWidgets.QTableWidgetItem(f"{row['quantity']:.2f}")
-            )
-            self.table.setItem(
-                row_index, 3, QtWidgets.QTableWidgetItem(format_money(row["total"]))
+        self.model.set_source(
+            lambda offset, limit: get_daily_sales_summary_page(date_str, offset, limit)
+        )
+        # Cada fila trae el total del día calculado por SQLite
+        total = self.model.row_at(0)["grand_total"] if self.model.rowCount() else 0.0
+        self.total_label.setText(format_money(total))
+
+
+class ProductListModel(QtCore.QAbstractListModel):
+    # Páginas de productos leídas bajo demanda; el texto se arma solo cuando Qt lo pide
+    PAGE_SIZE = 256
+    TILE_SIZE = QtCore.QSize(160, 120)
+
+    def __init__(self, icon: QtGui.QIcon, parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self._icon = icon
+        self._symbol = "$"
+        self._search = ""
+        self._total = 0
+        self._ids: list[int] = []
+        self._names: list[str] = []
+        self._prices = array("d")
+        self._stocks = array("d")
+
+    def set_query(self, search: str, symbol: str) -> None:
+        self.beginResetModel()
+        self._search = search
+        self._symbol = symbol
+        self._total = count_products(search)
+        self._ids = []
+        self._names = []
+        self._prices = array("d")
+        self._stocks = array("d")
+        self.endResetModel()
+        if self.canFetchMore():
+            self.fetchMore()
+
+    def total_count(self) -> int:
+        return self._total
+
+    def canFetchMore(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> bool:
+        return not parent.isValid() and len(self._ids) < self._total
+
+    def fetchMore(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> None:
+        if parent.isValid():
+            return
+        start = len(self._ids)
+        rows = list(list_products(self._search, limit=self.PAGE_SIZE, offset=start))
+        if not rows:
+            # La tabla cambió desde el conteo; no hay más que pedir
+            self._total = start
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), start, start + len(rows) - 1)
+        for row in rows:
+            self._ids.append(int(row.id))
+            self._names.append(row.name)
+            self._prices.append(row.price)
+            self._stocks.append(row.stock)
+        self.endInsertRows()
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._ids)
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        i = index.row()
+        if role == QtCore.Qt.DisplayRole:
+            return (
+                f"{self._names[i]}\n{_FMT(self._symbol, self._prices[i])}"
+                f"\nStock: {self._stocks[i]:.2f}"
             )
-            total += float(row["total"])
+        if role == QtCore.Qt.DecorationRole:
+            return self._icon
+        if role == QtCore.Qt.UserRole:
+            return self._ids[i]
+        if role == QtCore.Qt.SizeHintRole:
+            return self.TILE_SIZE
+        return None
 
-        self.total_label.setText(format_money(total))
+
+class RowsTableModel(QtCore.QAbstractTableModel):
+    # Tabla de solo lectura sobre filas de app.db; el id de cada fila va en UserRole
+    def __init__(
+        self,
+        columns: list[tuple[str, str, Any]],
+        parent: QtCore.QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._columns = columns
+        self._rows: list[Any] = []
+
+    def set_rows(self, rows: Iterable[Any]) -> None:
+        self.beginResetModel()
+        self._rows = list(rows)
+        self.endResetModel()
+
+    def row_at(self, row: int) -> Any:
+        return self._rows[row]
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._columns)
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            key, _header, formatter = self._columns[index.column()]
+            value = row[key]
+            if value is None:
+                return ""
+            return formatter(value) if formatter else str(value)
+        if role == QtCore.Qt.UserRole:
+            return _g(row, "id")
+        return None
+
+    def headerData(
+        self,
+        section: int,
+        orientation: QtCore.Qt.Orientation,
+        role: int = QtCore.Qt.DisplayRole,
+    ) -> Any:
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return self._columns[section][1]
+        return super().headerData(section, orientation, role)
+
+
+class PagedRowsModel(RowsTableModel):
+    # Pide filas por páginas a medida que la vista se desplaza hacia el final
+    PAGE_SIZE = 200
+
+    def __init__(
+        self,
+        columns: list[tuple[str, str, Any]],
+        parent: QtCore.QObject | None = None,
+    ) -> None:
+        super().__init__(columns, parent)
+        self._fetch_page: Any = None
+        self._has_more = False
+
+    def set_source(self, fetch_page: Any) -> None:
+        # fetch_page(offset, limit) -> filas
+        self.beginResetModel()
+        self._fetch_page = fetch_page
+        self._rows = []
+        self._has_more = True
+        self.endResetModel()
+        self.fetchMore()
+
+    def canFetchMore(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> bool:
+        return not parent.isValid() and self._has_more
+
+    def fetchMore(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> None:
+        if parent.isValid() or not self._has_more:
+            return
+        start = len(self._rows)
+        chunk = self._fetch_page(start, self.PAGE_SIZE)
+        self._has_more = len(chunk) == self.PAGE_SIZE
+        if not chunk:
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), start, start + len(chunk) - 1)
+        self._rows.extend(chunk)
+        self.endInsertRows()
+
+
+def _rows_table(model: RowsTableModel) -> QtWidgets.QTableView:
+    table = QtWidgets.QTableView()
+    table.setModel(model)
+    table.horizontalHeader().setStretchLastSection(True)
+    table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+    table.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+    return table
+
+
+def _selected_id(table: QtWidgets.QTableView) -> int | None:
+    indexes = table.selectionModel().selectedRows()
+    if not indexes:
+        return None
+    return indexes[0].data(QtCore.Qt.UserRole)
+
+
+_QTY = "{:.2f}".format
+
+_SUMMARY_COLUMNS = [
+    ("barcode", "Código", None),
+    ("name", "Producto", None),
+    ("quantity", "Cantidad", _QTY),
+    ("total", "Total", format_money),
+]
+
+_CONTACT_COLUMNS = [
+    ("name", "Nombre", None),
+    ("phone", "Teléfono", None),
+    ("email", "Correo", None),
+    ("address", "Dirección", None),
+]
 
 
 class InventoryWidget(QtWidgets.QWidget):
@@ -342,16 +671,26 @@ class InventoryWidget(QtWidgets.QWidget):
 
         self.search_input = QtWidgets.QLineEdit()
         self.search_input.setPlaceholderText("Buscar por código o nombre")
-        self.search_input.textChanged.connect(self.refresh_list)
-
-        self.list_widget = QtWidgets.QListWidget()
-        self.list_widget.setViewMode(QtWidgets.QListView.IconMode)
-        self.list_widget.setResizeMode(QtWidgets.QListView.Adjust)
-        self.list_widget.setMovement(QtWidgets.QListView.Static)
-        self.list_widget.setSpacing(12)
-        self.list_widget.setIconSize(QtCore.QSize(64, 64))
-        self.list_widget.itemSelectionChanged.connect(self.update_selection)
-        self.list_widget.itemDoubleClicked.connect(self.edit_product)
+        self._search_timer = QtCore.QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(150)
+        self._search_timer.timeout.connect(self.refresh_list)
+        self.search_input.textChanged.connect(self._search_timer.start)
+
+        self.product_model = ProductListModel(
+            self.style().standardIcon(QtWidgets.QStyle.SP_FileIcon), self
+        )
+        self.list_view = QtWidgets.QListView()
+        self.list_view.setViewMode(QtWidgets.QListView.IconMode)
+        self.list_view.setResizeMode(QtWidgets.QListView.Adjust)
+        self.list_view.setMovement(QtWidgets.QListView.Static)
+        self.list_view.setSpacing(12)
+        self.list_view.setIconSize(QtCore.QSize(64, 64))
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.list_view.setModel(self.product_model)
+        self.list_view.selectionModel().selectionChanged.connect(self.update_selection)
+        self.list_view.doubleClicked.connect(self.edit_product)
 
         self.total_label = QtWidgets.QLabel("Total productos: 0")
 
@@ -391,33 +730,25 @@ class InventoryWidget(QtWidgets.QWidget):
 
         main_layout = QtWidgets.QHBoxLayout(self)
         main_layout.addWidget(left_container)
-        main_layout.addWidget(self.list_widget, 1)
+        main_layout.addWidget(self.list_view, 1)
 
+    def showEvent(self, event: QtGui.QShowEvent) -> None:
+        # Las ventas y compras cambian existencias mientras la página está oculta
+        super().showEvent(event)
         self.refresh_list()
 
     def refresh_list(self) -> None:
-        search = self.search_input.text().strip()
-        products = list_products(search)
-        self.list_widget.clear()
-
-        icon = self.style().standardIcon(QtWidgets.QStyle.SP_FileIcon)
-        for row in products:
-            item = QtWidgets.QListWidgetItem(
-                icon,
-                f"{row['name']}\n{format_money(row['price'])}\nStock: {row['stock']:.2f}",
-            )
-            item.setData(QtCore.Qt.UserRole, int(row["id"]))
-            item.setSizeHint(QtCore.QSize(160, 120))
-            self.list_widget.addItem(item)
-
-        self.total_label.setText(f"Total productos: {len(products)}")
+        self.product_model.set_query(
+            self.search_input.text().strip(), get_currency_symbol()
+        )
+        self.total_label.setText(f"Total productos: {self.product_model.total_count()}")
         self.update_selection()
 
     def _current_product_id(self) -> int | None:
-        items = self.list_widget.selectedItems()
-        if not items:
+        indexes = self.list_view.selectionModel().selectedIndexes()
+        if not indexes:
             return None
-        return items[0].data(QtCore.Qt.UserRole)
+        return indexes[0].data(QtCore.Qt.UserRole)
 
     def update_selection(self) -> None:
         product_id = self._current_product_id()
@@ -458,6 +789,7 @@ class InventoryWidget(QtWidgets.QWidget):
             )
             return
 
+        _product_cache.cache_clear()
         self.refresh_list()
 
     def edit_product(self) -> None:
@@ -470,7 +802,7 @@ class InventoryWidget(QtWidgets.QWidget):
             return
 
         dialog = ProductDialog("Editar producto", self)
-        dialog.set_values(dict(row))
+        dialog.set_values(row)
         if dialog.exec() != QtWidgets.QDialog.Accepted:
             return
 
@@ -488,6 +820,7 @@ class InventoryWidget(QtWidgets.QWidget):
             )
             return
 
+        _product_cache.cache_clear()
         self.refresh_list()
 
     def delete_product_dialog(self) -> None:
@@ -502,143 +835,62 @@ class InventoryWidget(QtWidgets.QWidget):
             return
 
         delete_product(product_id)
+        _product_cache.cache_clear()
         self.refresh_list()
 
 
-class ContactDialog(QtWidgets.QDialog):
-    def __init__(self, title: str, parent: QtWidgets.QWidget | None = None) -> None:
-        super().__init__(parent)
-        self.setWindowTitle(title)
-        self.setMinimumWidth(380)
-
-        self.name_input = QtWidgets.QLineEdit()
-        self.phone_input = QtWidgets.QLineEdit()
-        self.email_input = QtWidgets.QLineEdit()
-        self.address_input = QtWidgets.QLineEdit()
-
-        form = QtWidgets.QFormLayout()
-        form.addRow("Nombre", self.name_input)
-        form.addRow("Teléfono", self.phone_input)
-        form.addRow("Correo", self.email_input)
-        form.addRow("Dirección", self.address_input)
-
-        buttons = QtWidgets.QDialogButtonBox(
-            QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel
-        )
-        buttons.accepted.connect(self.accept)
-        buttons.rejected.connect(self.reject)
-
-        layout = QtWidgets.QVBoxLayout(self)
-        layout.addLayout(form)
-        layout.addWidget(buttons)
-
-    def set_values(self, values: Dict[str, Any]) -> None:
-        self.name_input.setText(values.get("name", ""))
-        self.phone_input.setText(values.get("phone", ""))
-        self.email_input.setText(values.get("email", ""))
-        self.address_input.setText(values.get("address", ""))
+class ContactDialog(_SchemaDialog):
+    FIELDS = [
+        ("name", "Nombre", QtWidgets.QLineEdit, {}),
+        ("phone", "Teléfono", QtWidgets.QLineEdit, {}),
+        ("email", "Correo", QtWidgets.QLineEdit, {}),
+        ("address", "Dirección", QtWidgets.QLineEdit, {}),
+    ]
 
-    def get_values(self) -> Dict[str, Any]:
-        return {
-            "name": self.name_input.text().strip(),
-            "phone": self.phone_input.text().strip(),
-            "email": self.email_input.text().strip(),
-            "address": self.address_input.text().strip(),
-        }
 
+class ExpenseDialog(_SchemaDialog):
+    MIN_WIDTH = 360
+    FIELDS = [
+        ("concept", "Concepto", QtWidgets.QLineEdit, {}),
+        ("amount", "Monto", QtWidgets.QDoubleSpinBox, _AMOUNT),
+    ]
 
-class ExpenseDialog(QtWidgets.QDialog):
     def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
-        super().__init__(parent)
-        self.setWindowTitle("Nuevo gasto")
-        self.setMinimumWidth(360)
-
-        self.concept_input = QtWidgets.QLineEdit()
-        self.amount_input = QtWidgets.QDoubleSpinBox()
-        self.amount_input.setDecimals(2)
-        self.amount_input.setMaximum(999999)
+        super().__init__("Nuevo gasto", parent)
         self.amount_input.setPrefix(f"{get_currency_symbol()} ")
 
-        form = QtWidgets.QFormLayout()
-        form.addRow("Concepto", self.concept_input)
-        form.addRow("Monto", self.amount_input)
 
-        buttons = QtWidgets.QDialogButtonBox(
-            QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel
-        )
-        buttons.accepted.connect(self.accept)
-        buttons.rejected.connect(self.reject)
-
-        layout = QtWidgets.QVBoxLayout(self)
-        layout.addLayout(form)
-        layout.addWidget(buttons)
-
-    def get_values(self) -> Dict[str, Any]:
-        return {
-            "concept": self.concept_input.text().strip(),
-            "amount": float(self.amount_input.value()),
-        }
-
-
-class UserDialog(QtWidgets.QDialog):
-    def __init__(self, title: str, parent: QtWidgets.QWidget | None = None) -> None:
-        super().__init__(parent)
-        self.setWindowTitle(title)
-        self.setMinimumWidth(380)
-
-        self.username_input = QtWidgets.QLineEdit()
-        self.password_input = QtWidgets.QLineEdit()
-        self.password_input.setEchoMode(QtWidgets.QLineEdit.Password)
-        self.display_name_input = QtWidgets.QLineEdit()
-        self.role_input = QtWidgets.QComboBox()
-        self.role_input.addItems(["Administrador", "Supervisor", "Cajero"])
-        self.active_input = QtWidgets.QCheckBox("Usuario activo")
-        self.active_input.setChecked(True)
-
-        form = QtWidgets.QFormLayout()
-        form.addRow("Usuario", self.username_input)
-        form.addRow("Contraseña", self.password_input)
-        form.addRow("Nombre", self.display_name_input)
-        form.addRow("Rol", self.role_input)
-        form.addRow("", self.active_input)
-
-        buttons = QtWidgets.QDialogButtonBox(
-            QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel
-        )
-        buttons.accepted.connect(self.accept)
-        buttons.rejected.connect(self.reject)
-
-        layout = QtWidgets.QVBoxLayout(self)
-        layout.addLayout(form)
-        layout.addWidget(buttons)
-
-    def set_values(self, values: Dict[str, Any]) -> None:
-        self.username_input.setText(values.get("username", ""))
-        self.display_name_input.setText(values.get("display_name", ""))
-        role = values.get("role", "Administrador")
-        index = self.role_input.findText(role)
-        if index >= 0:
-            self.role_input.setCurrentIndex(index)
-        self.active_input.setChecked(bool(values.get("is_active", 1)))
-
-    def get_values(self) -> Dict[str, Any]:
-        return {
-            "username": self.username_input.text().strip(),
-            "password": self.password_input.text().strip(),
-            "display_name": self.display_name_input.text().strip(),
-            "role": self.role_input.currentText(),
-            "is_active": self.active_input.isChecked(),
-        }
+class UserDialog(_SchemaDialog):
+    FIELDS = [
+        ("username", "Usuario", QtWidgets.QLineEdit, {}),
+        (
+            "password",
+            "Contraseña",
+            QtWidgets.QLineEdit,
+            {"echoMode": QtWidgets.QLineEdit.Password},
+        ),
+        ("display_name", "Nombre", QtWidgets.QLineEdit, {}),
+        (
+            "role",
+            "Rol",
+            QtWidgets.QComboBox,
+            {"items": ["Administrador", "Supervisor", "Cajero"]},
+        ),
+        (
+            "is_active",
+            "",
+            QtWidgets.QCheckBox,
+            {"text": "Usuario activo", "checked": True},
+        ),
+    ]
 
 
 class CustomersWidget(QtWidgets.QWidget):
     def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
         super().__init__(parent)
-        self.table = QtWidgets.QTableWidget(0, 4)
-        self.table.setHorizontalHeaderLabels(["Nombre", "Teléfono", "Correo", "Dirección"])
-        self.table.horizontalHeader().setStretchLastSection(True)
-        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
-        self.table.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.model = RowsTableModel(_CONTACT_COLUMNS, self)
+        self.table = _rows_table(self.model)
+        self._by_id: Dict[int, Any] = {}
 
         self.add_button = QtWidgets.QPushButton("Agregar")
         self.add_button.clicked.connect(self.add_item)
@@ -661,20 +913,11 @@ class CustomersWidget(QtWidgets.QWidget):
 
     def refresh(self) -> None:
         rows = list_customers()
-        self.table.setRowCount(len(rows))
-        for row_index, row in enumerate(rows):
-            item = QtWidgets.QTableWidgetItem(row["name"])
-            item.setData(QtCore.Qt.UserRole, int(row["id"]))
-            self.table.setItem(row_index, 0, item)
-            self.table.setItem(row_index, 1, QtWidgets.QTableWidgetItem(row["phone"] or ""))
-            self.table.setItem(row_index, 2, QtWidgets.QTableWidgetItem(row["email"] or ""))
-            self.table.setItem(row_index, 3, QtWidgets.QTableWidgetItem(row["address"] or ""))
+        self._by_id = {int(row["id"]): row for row in rows}
+        self.model.set_rows(rows)
 
     def _current_id(self) -> int | None:
-        items = self.table.selectedItems()
-        if not items:
-            return None
-        return items[0].data(QtCore.Qt.UserRole)
+        return _selected_id(self.table)
 
     def add_item(self) -> None:
         dialog = ContactDialog("Nuevo cliente", self)
@@ -691,12 +934,11 @@ class CustomersWidget(QtWidgets.QWidget):
         customer_id = self._current_id()
         if not customer_id:
             return
-        row = list_customers()
-        current = next((r for r in row if r["id"] == customer_id), None)
+        current = self._by_id.get(customer_id)
         if current is None:
             return
         dialog = ContactDialog("Editar cliente", self)
-        dialog.set_values(dict(current))
+        dialog.set_values(current)
         if dialog.exec() != QtWidgets.QDialog.Accepted:
             return
         values = dialog.get_values()
@@ -720,11 +962,9 @@ class CustomersWidget(QtWidgets.QWidget):
 class SuppliersWidget(QtWidgets.QWidget):
     def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
         super().__init__(parent)
-        self.table = QtWidgets.QTableWidget(0, 4)
-        self.table.setHorizontalHeaderLabels(["Nombre", "Teléfono", "Correo", "Dirección"])
-        self.table.horizontalHeader().setStretchLastSection(True)
-        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
-        self.table.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.model = RowsTableModel(_CONTACT_COLUMNS, self)
+        self.table = _rows_table(self.model)
+        self._by_id: Dict[int, Any] = {}
 
         self.add_button = QtWidgets.QPushButton("Agregar")
         self.add_button.clicked.connect(self.add_item)
@@ -747,20 +987,11 @@ class SuppliersWidget(QtWidgets.QWidget):
 
     def refresh(self) -> None:
         rows = list_suppliers()
-        self.table.setRowCount(len(rows))
-        for row_index, row in enumerate(rows):
-            item = QtWidgets.QTableWidgetItem(row["name"])
-            item.setData(QtCore.Qt.UserRole, int(row["id"]))
-            self.table.setItem(row_index, 0, item)
-            self.table.setItem(row_index, 1, QtWidgets.QTableWidgetItem(row["phone"] or ""))
-            self.table.setItem(row_index, 2, QtWidgets.QTableWidgetItem(row["email"] or ""))
-            self.table.setItem(row_index, 3, QtWidgets.QTableWidgetItem(row["address"] or ""))
+        self._by_id = {int(row["id"]): row for row in rows}
+        self.model.set_rows(rows)
 
     def _current_id(self) -> int | None:
-        items = self.table.selectedItems()
-        if not items:
-            return None
-        return items[0].data(QtCore.Qt.UserRole)
+        return _selected_id(self.table)
 
     def add_item(self) -> None:
         dialog = ContactDialog("Nuevo proveedor", self)
@@ -777,12 +1008,11 @@ class SuppliersWidget(QtWidgets.QWidget):
         supplier_id = self._current_id()
         if not supplier_id:
             return
-        row = list_suppliers()
-        current = next((r for r in row if r["id"] == supplier_id), None)
+        current = self._by_id.get(supplier_id)
         if current is None:
             return
         dialog = ContactDialog("Editar proveedor", self)
-        dialog.set_values(dict(current))
+        dialog.set_values(current)
         if dialog.exec() != QtWidgets.QDialog.Accepted:
             return
         values = dialog.get_values()
@@ -806,11 +1036,18 @@ class SuppliersWidget(QtWidgets.QWidget):
 class ExpensesWidget(QtWidgets.QWidget):
     def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
         super().__init__(parent)
-        self.table = QtWidgets.QTableWidget(0, 3)
-        self.table.setHorizontalHeaderLabels(["Fecha", "Concepto", "Monto"])
-        self.table.horizontalHeader().setStretchLastSection(True)
-        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
-        self.table.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        # Consultas en curso, por objeto de señales, hasta que devuelven su resultado
+        self._refresh_jobs: Dict[QtCore.QObject, DbWorker] = {}
+        self._latest_refresh: QtCore.QObject | None = None
+        self.model = RowsTableModel(
+            [
+                ("created_at", "Fecha", None),
+                ("concept", "Concepto", None),
+                ("amount", "Monto", format_money),
+            ],
+            self,
+        )
+        self.table = _rows_table(self.model)
 
         self.add_button = QtWidgets.QPushButton("Agregar")
         self.add_button.clicked.connect(self.add_item)
@@ -829,20 +1066,28 @@ class ExpensesWidget(QtWidgets.QWidget):
         self.refresh()
 
     def refresh(self) -> None:
-        rows = list_expenses()
-        self.table.setRowCount(len(rows))
-        for row_index, row in enumerate(rows):
-            item = QtWidgets.QTableWidgetItem(row["created_at"])
-            item.setData(QtCore.Qt.UserRole, int(row["id"]))
-            self.table.setItem(row_index, 0, item)
-            self.table.setItem(row_index, 1, QtWidgets.QTableWidgetItem(row["concept"]))
-            self.table.setItem(row_index, 2, QtWidgets.QTableWidgetItem(format_money(row["amount"])))
+        job = DbWorker(list_expenses)
+        self._refresh_jobs[job.signals] = job
+        self._latest_refresh = job.signals
+        job.signals.result.connect(self._apply_rows)
+        job.signals.error.connect(self._on_refresh_error)
+        job.start()
+
+    def _apply_rows(self, rows: list[Any]) -> None:
+        signals = self.sender()
+        self._refresh_jobs.pop(signals, None)
+        # Una consulta anterior que termine tarde no pisa la más reciente
+        if signals is self._latest_refresh:
+            self.model.set_rows(rows)
+
+    def _on_refresh_error(self, message: str) -> None:
+        signals = self.sender()
+        self._refresh_jobs.pop(signals, None)
+        if signals is self._latest_refresh:
+            QtWidgets.QMessageBox.critical(self, "Error", message)
 
     def _current_id(self) -> int | None:
-        items = self.table.selectedItems()
-        if not items:
-            return None
-        return items[0].data(QtCore.Qt.UserRole)
+        return _selected_id(self.table)
 
     def add_item(self) -> None:
         dialog = ExpenseDialog(self)
@@ -869,11 +1114,17 @@ class ExpensesWidget(QtWidgets.QWidget):
 class UsersWidget(QtWidgets.QWidget):
     def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
         super().__init__(parent)
-        self.table = QtWidgets.QTableWidget(0, 4)
-        self.table.setHorizontalHeaderLabels(["Usuario", "Nombre", "Rol", "Activo"])
-        self.table.horizontalHeader().setStretchLastSection(True)
-        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
-        self.table.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.model = RowsTableModel(
+            [
+                ("username", "Usuario", None),
+                ("display_name", "Nombre", None),
+                ("role", "Rol", None),
+                ("is_active", "Activo", lambda active: "Sí" if active else "No"),
+            ],
+            self,
+        )
+        self.table = _rows_table(self.model)
+        self._by_id: Dict[int, Any] = {}
 
         self.add_button = QtWidgets.QPushButton("Agregar")
         self.add_button.clicked.connect(self.add_item)
@@ -896,20 +1147,11 @@ class UsersWidget(QtWidgets.QWidget):
 
     def refresh(self) -> None:
         rows = list_users()
-        self.table.setRowCount(len(rows))
-        for row_index, row in enumerate(rows):
-            item = QtWidgets.QTableWidgetItem(row["username"])
-            item.setData(QtCore.Qt.UserRole, int(row["id"]))
-            self.table.setItem(row_index, 0, item)
-            self.table.setItem(row_index, 1, QtWidgets.QTableWidgetItem(row["display_name"]))
-            self.table.setItem(row_index, 2, QtWidgets.QTableWidgetItem(row["role"]))
-            self.table.setItem(row_index, 3, QtWidgets.QTableWidgetItem("Sí" if row["is_active"] else "No"))
+        self._by_id = {int(row["id"]): row for row in rows}
+        self.model.set_rows(rows)
 
     def _current_id(self) -> int | None:
-        items = self.table.selectedItems()
-        if not items:
-            return None
-        return items[0].data(QtCore.Qt.UserRole)
+        return _selected_id(self.table)
 
     def add_item(self) -> None:
         dialog = UserDialog("Nuevo usuario", self)
@@ -919,26 +1161,24 @@ class UsersWidget(QtWidgets.QWidget):
         if not values["username"] or not values["password"]:
             QtWidgets.QMessageBox.warning(self, "Datos incompletos", "Usuario y contraseña requeridos")
             return
-        ok = add_user(values["username"], values["password"], values["display_name"], values["role"])
-        if not ok:
-            QtWidgets.QMessageBox.warning(self, "Duplicado", "Ese usuario ya existe")
-            return
-        self.refresh()
+        self._save_user(
+            add_user, values["username"], values["password"], values["display_name"], values["role"]
+        )
 
     def edit_item(self) -> None:
         user_id = self._current_id()
         if not user_id:
             return
-        rows = list_users()
-        current = next((r for r in rows if r["id"] == user_id), None)
+        current = self._by_id.get(user_id)
         if current is None:
             return
         dialog = UserDialog("Editar usuario", self)
-        dialog.set_values(dict(current))
+        dialog.set_values(current)
         if dialog.exec() != QtWidgets.QDialog.Accepted:
             return
         values = dialog.get_values()
-        ok = update_user(
+        self._save_user(
+            update_user,
             user_id,
             values["username"],
             values["password"] or None,
@@ -946,11 +1186,32 @@ class UsersWidget(QtWidgets.QWidget):
             values["role"],
             values["is_active"],
         )
+
+    def _save_user(self, fn: Any, *args: Any) -> None:
+        # El hash PBKDF2 tarda; se guarda fuera del hilo de la interfaz, como el login
+        self._set_saving(True)
+        self._save_job = DbWorker(fn, *args)
+        self._save_job.signals.result.connect(self._on_user_saved)
+        self._save_job.signals.error.connect(self._on_user_error)
+        self._save_job.start()
+
+    def _set_saving(self, saving: bool) -> None:
+        for widget in (self.add_button, self.edit_button, self.delete_button):
+            widget.setEnabled(not saving)
+
+    def _on_user_saved(self, ok: bool) -> None:
+        self._save_job = None
+        self._set_saving(False)
         if not ok:
             QtWidgets.QMessageBox.warning(self, "Duplicado", "Ese usuario ya existe")
             return
         self.refresh()
 
+    def _on_user_error(self, message: str) -> None:
+        self._save_job = None
+        self._set_saving(False)
+        QtWidgets.QMessageBox.critical(self, "Error", message)
+
     def delete_item(self) -> None:
         user_id = self._current_id()
         if not user_id:
@@ -966,25 +1227,16 @@ class PurchasesWidget(QtWidgets.QWidget):
     def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
         super().__init__(parent)
         self.cart: Dict[str, Dict[str, Any]] = {}
+        # Renglón de la tabla por código y suma acumulada de line_cents
+        self._row_of: Dict[str, int] = {}
+        self._subtotal = 0
 
         self.barcode_input = QtWidgets.QLineEdit()
         self.barcode_input.setPlaceholderText("Escanea el código de barras")
         self.barcode_input.returnPressed.connect(self.add_barcode)
-        # Fuerza texto negro y fondo blanco para que siempre sea visible
-        self.barcode_input.setStyleSheet(
-            "color: #000000; background: #ffffff; selection-color: #000000; "
-            "selection-background-color: #ffd54f; border: 1px solid #c0c4cc;"
-        )
-        barcode_palette = self.barcode_input.palette()
-        barcode_palette.setColor(QtGui.QPalette.Text, QtCore.Qt.black)
-        barcode_palette.setColor(QtGui.QPalette.Base, QtCore.Qt.white)
-        barcode_palette.setColor(QtGui.QPalette.PlaceholderText, QtCore.Qt.darkGray)
-        self.barcode_input.setPalette(barcode_palette)
-        # Fuerza texto negro y fondo claro; también corrige la paleta para evitar heredar colores blancos
-        self.barcode_input.setStyleSheet(
-            "color: #000000; background: #ffffff; selection-color: #000000; "
-            "selection-background-color: #ffd54f; border: 1px solid #c0c4cc;"
-        )
+        # Texto negro y fondo claro vía QLineEdit#barcodeInput en la hoja del tablero;
+        # la paleta corrige el placeholder para evitar heredar colores blancos
+        self.barcode_input.setObjectName("barcodeInput")
         barcode_palette = self.barcode_input.palette()
         barcode_palette.setColor(QtGui.QPalette.Text, QtCore.Qt.black)
         barcode_palette.setColor(QtGui.QPalette.Base, QtCore.Qt.white)
@@ -1043,10 +1295,15 @@ class PurchasesWidget(QtWidgets.QWidget):
         layout.addLayout(totals)
 
     def _load_suppliers(self) -> None:
-        self.supplier_input.clear()
-        self.supplier_input.addItem("Sin proveedor", None)
+        # Se arma el modelo completo y se asigna de una vez: una sola notificación
+        model = QtGui.QStandardItemModel(self.supplier_input)
+        model.appendRow(QtGui.QStandardItem("Sin proveedor"))
         for row in list_suppliers():
-            self.supplier_input.addItem(row["name"], int(row["id"]))
+            item = QtGui.QStandardItem(row["name"])
+            item.setData(int(row["id"]), QtCore.Qt.UserRole)
+            model.appendRow(item)
+        # QComboBox libera el modelo anterior porque también es su padre
+        self.supplier_input.setModel(model)
 
     def add_barcode(self) -> None:
         barcode = self.barcode_input.text().strip()
@@ -1054,72 +1311,118 @@ class PurchasesWidget(QtWidgets.QWidget):
             return
         qty = float(self.qty_input.value())
         cost = float(self.cost_input.value())
-        product = get_product_by_barcode(barcode)
-        if product is None:
-            QtWidgets.QApplication.beep()
-            return
-        if cost <= 0:
-            cost = float(product["price"])
-
-        if barcode in self.cart:
-            self.cart[barcode]["quantity"] += qty
+        item = self.cart.get(barcode)
+        if item is not None:
+            item["quantity"] += qty
         else:
-            self.cart[barcode] = {
+            product = _product_cache(barcode)
+            if product is None:
+                QtWidgets.QApplication.beep()
+                return
+            cost_cents = _to_cents(cost if cost > 0 else float(product["price"]))
+            item = self.cart[barcode] = {
                 "product_id": product["id"],
                 "barcode": product["barcode"],
                 "name": product["name"],
-                "cost": cost,
+                "cost": cost_cents / 100,
+                "cost_cents": cost_cents,
                 "quantity": qty,
+                "line_cents": 0,
             }
 
-        self.cart[barcode]["line_total"] = (
-            self.cart[barcode]["cost"] * self.cart[barcode]["quantity"]
-        )
+        # Centavos enteros en el carrito; line_total queda para app.db y el ticket
+        line_cents = round(item["cost_cents"] * item["quantity"])
+        self._subtotal += line_cents - item["line_cents"]
+        item["line_cents"] = line_cents
+        item["line_total"] = line_cents / 100
         self.barcode_input.clear()
         self.qty_input.setValue(1)
         self.cost_input.setValue(0)
-        self.update_table()
+        self._upsert_row(barcode)
+        self.total_label.setText(_format_cents(self._subtotal))
+
+    def _upsert_row(self, barcode: str) -> None:
+        """Agrega el renglón del código o actualiza solo cantidad y total."""
+        item = self.cart[barcode]
+        row = self._row_of.get(barcode)
+        if row is None:
+            row = self._row_of[barcode] = self.table.rowCount()
+            self.table.insertRow(row)
+            for column, text in enumerate(self._row_cells(item)):
+                self.table.setItem(row, column, QtWidgets.QTableWidgetItem(text))
+        else:
+            self.table.item(row, 3).setText(f"{item['quantity']:.2f}")
+            self.table.item(row, 4).setText(_format_cents(item["line_cents"]))
+
+    @staticmethod
+    def _row_cells(item: Mapping[str, Any]) -> tuple[str, ...]:
+        return (
+            item["barcode"],
+            item["name"],
+            _format_cents(item["cost_cents"]),
+            f"{item['quantity']:.2f}",
+            _format_cents(item["line_cents"]),
+        )
 
     def update_table(self) -> None:
-        self.table.setRowCount(len(self.cart))
-        total = 0.0
-        for row, item in enumerate(self.cart.values()):
-            self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(item["barcode"]))
-            self.table.setItem(row, 1, QtWidgets.QTableWidgetItem(item["name"]))
-            self.table.setItem(row, 2, QtWidgets.QTableWidgetItem(format_money(item["cost"])))
-            self.table.setItem(row, 3, QtWidgets.QTableWidgetItem(f"{item['quantity']:.2f}"))
-            self.table.setItem(row, 4, QtWidgets.QTableWidgetItem(format_money(item["line_total"])))
-            total += item["line_total"]
-        self.total_label.setText(format_money(total))
+        if not self.cart and self.table.rowCount() == 0:
+            return
+        # Reconstrucción completa reutilizando los QTableWidgetItem existentes
+        items = self.cart.values()
+        _fill_table(self.table, [self._row_cells(item) for item in items])
+        self._row_of = {barcode: row for row, barcode in enumerate(self.cart)}
+        self._subtotal = sum(item["line_cents"] for item in items)
+        self.total_label.setText(_format_cents(self._subtotal))
 
     def save_purchase(self) -> None:
         if not self.cart:
             return
         supplier_id = self.supplier_input.currentData()
-        try:
-            record_purchase(self.cart.values(), supplier_id)
-        except Exception as exc:  # noqa: BLE001
-            QtWidgets.QMessageBox.critical(self, "Error", str(exc))
-            return
+        # Copia del carrito: el hilo de trabajo no debe ver cambios posteriores
+        items = [dict(item) for item in self.cart.values()]
+        self._set_saving(True)
+        self._save_job = DbWorker(record_purchase, items, supplier_id)
+        self._save_job.signals.result.connect(self._on_purchase_saved)
+        self._save_job.signals.error.connect(self._on_purchase_error)
+        self._save_job.start()
+
+    def _set_saving(self, saving: bool) -> None:
+        for widget in (self.barcode_input, self.add_button, self.save_button):
+            widget.setEnabled(not saving)
+
+    def _on_purchase_saved(self, _result: Any) -> None:
+        self._set_saving(False)
         self.cart.clear()
         self.update_table()
         QtWidgets.QMessageBox.information(self, "Compra", "Compra guardada")
 
+    def _on_purchase_error(self, message: str) -> None:
+        self._set_saving(False)
+        QtWidgets.QMessageBox.critical(self, "Error", message)
+
+
+_EXPORT_HEADER = ("barcode", "name", "quantity", "total")
+
 
 class ReportsWidget(QtWidgets.QWidget):
     def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
         super().__init__(parent)
+        # Consultas en curso, por objeto de señales, hasta que devuelven su resultado
+        self._top_jobs: Dict[QtCore.QObject, DbWorker] = {}
+        self._latest_top: QtCore.QObject | None = None
         self.date_input = QtWidgets.QDateEdit(QtCore.QDate.currentDate())
         self.date_input.setCalendarPopup(True)
         self.refresh_button = QtWidgets.QPushButton("Actualizar")
         self.refresh_button.clicked.connect(self.refresh)
 
-        self.daily_table = QtWidgets.QTableWidget(0, 4)
-        self.daily_table.setHorizontalHeaderLabels(["Código", "Producto", "Cantidad", "Total"])
+        self.daily_model = PagedRowsModel(_SUMMARY_COLUMNS, self)
+        self.daily_table = QtWidgets.QTableView()
+        self.daily_table.setModel(self.daily_model)
         self.daily_table.horizontalHeader().setStretchLastSection(True)
 
-        self.top_table = QtWidgets.QTableWidget(0, 4)
-        self.top_table.setHorizontalHeaderLabels(["Código", "Producto", "Cantidad", "Total"])
+        self.top_model = RowsTableModel(_SUMMARY_COLUMNS, self)
+        self.top_table = QtWidgets.QTableView()
+        self.top_table.setModel(self.top_model)
         self.top_table.horizontalHeader().setStretchLastSection(True)
 
         self.export_csv = QtWidgets.QPushButton("Exportar CSV")
@@ -1128,6 +1431,8 @@ class ReportsWidget(QtWidgets.QWidget):
         self.export_excel.clicked.connect(lambda: self.export("xlsx"))
         self.export_pdf = QtWidgets.QPushButton("Exportar PDF")
         self.export_pdf.clicked.connect(lambda: self.export("pdf"))
+        self.reprint_button = QtWidgets.QPushButton("Reimprimir tickets")
+        self.reprint_button.clicked.connect(self.reprint_tickets)
 
         top_bar = QtWidgets.QHBoxLayout()
         top_bar.addWidget(QtWidgets.QLabel("Fecha:"))
@@ -1137,6 +1442,7 @@ class ReportsWidget(QtWidgets.QWidget):
         top_bar.addWidget(self.export_csv)
         top_bar.addWidget(self.export_excel)
         top_bar.addWidget(self.export_pdf)
+        top_bar.addWidget(self.reprint_button)
 
         tabs = QtWidgets.QTabWidget()
         daily_tab = QtWidgets.QWidget()
@@ -1157,21 +1463,50 @@ class ReportsWidget(QtWidgets.QWidget):
 
     def refresh(self) -> None:
         date_str = self.date_input.date().toString("yyyy-MM-dd")
-        rows = get_daily_sales_summary(date_str)
-        self.daily_table.setRowCount(len(rows))
-        for row_index, row in enumerate(rows):
-            self.daily_table.setItem(row_index, 0, QtWidgets.QTableWidgetItem(row["barcode"]))
-            self.daily_table.setItem(row_index, 1, QtWidgets.QTableWidgetItem(row["name"]))
-            self.daily_table.setItem(row_index, 2, QtWidgets.QTableWidgetItem(f"{row['quantity']:.2f}"))
-            self.daily_table.setItem(row_index, 3, QtWidgets.QTableWidgetItem(format_money(row["total"])))
-
-        top_rows = get_top_products(30)
-        self.top_table.setRowCount(len(top_rows))
-        for row_index, row in enumerate(top_rows):
-            self.top_table.setItem(row_index, 0, QtWidgets.QTableWidgetItem(row["barcode"]))
-            self.top_table.setItem(row_index, 1, QtWidgets.QTableWidgetItem(row["name"]))
-            self.top_table.setItem(row_index, 2, QtWidgets.QTableWidgetItem(f"{row['quantity']:.2f}"))
-            self.top_table.setItem(row_index, 3, QtWidgets.QTableWidgetItem(format_money(row["total"])))
+        self.daily_model.set_source(
+            lambda offset, limit: get_daily_sales_summary_page(date_str, offset, limit)
+        )
+        job = DbWorker(get_top_products, 30)
+        self._top_jobs[job.signals] = job
+        self._latest_top = job.signals
+        job.signals.result.connect(self._apply_top_rows)
+        job.signals.error.connect(self._on_top_error)
+        job.start()
+
+    def _apply_top_rows(self, rows: list[Any]) -> None:
+        signals = self.sender()
+        self._top_jobs.pop(signals, None)
+        # Una consulta anterior que termine tarde no pisa la más reciente
+        if signals is self._latest_top:
+            self.top_model.set_rows(rows)
+
+    def _on_top_error(self, message: str) -> None:
+        signals = self.sender()
+        self._top_jobs.pop(signals, None)
+        if signals is self._latest_top:
+            QtWidgets.QMessageBox.critical(self, "Error", message)
+
+    def reprint_tickets(self) -> None:
+        date_str = self.date_input.date().toString("yyyy-MM-dd")
+        self.reprint_button.setEnabled(False)
+        # La consulta y el render corren en el hilo de trabajo
+        self._reprint_job = DbWorker(reprint_day_tickets, date_str, ticket_settings())
+        self._reprint_job.signals.result.connect(self._on_tickets_reprinted)
+        self._reprint_job.signals.error.connect(self._on_reprint_error)
+        self._reprint_job.start()
+
+    def _on_tickets_reprinted(self, paths: list[Path]) -> None:
+        self.reprint_button.setEnabled(True)
+        if not paths:
+            QtWidgets.QMessageBox.information(self, "Reimprimir", "No hay ventas ese día")
+            return
+        QtWidgets.QMessageBox.information(
+            self, "Reimprimir", f"{len(paths)} tickets generados en {TICKETS_DIR}"
+        )
+
+    def _on_reprint_error(self, message: str) -> None:
+        self.reprint_button.setEnabled(True)
+        QtWidgets.QMessageBox.critical(self, "Error", message)
 
     def export(self, fmt: str) -> None:
         date_str = self.date_input.date().toString("yyyy-MM-dd")
@@ -1195,14 +1530,28 @@ class ReportsWidget(QtWidgets.QWidget):
             )
             if not path:
                 return
-            pd.DataFrame(data).to_csv(path, index=False)
+            with open(path, "w", newline="", encoding="utf-8") as handle:
+                writer = csv.writer(handle)
+                writer.writerow(_EXPORT_HEADER)
+                writer.writerows(
+                    (row["barcode"], row["name"], row["quantity"], row["total"])
+                    for row in data
+                )
         elif fmt == "xlsx":
             path, _ = QtWidgets.QFileDialog.getSaveFileName(
                 self, "Exportar Excel", "", "Excel (*.xlsx)"
             )
             if not path:
                 return
-            pd.DataFrame(data).to_excel(path, index=False)
+            from openpyxl import Workbook
+
+            # write_only escribe en streaming, sin guardar las celdas en memoria
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet()
+            sheet.append(_EXPORT_HEADER)
+            for row in data:
+                sheet.append((row["barcode"], row["name"], row["quantity"], row["total"]))
+            workbook.save(path)
         elif fmt == "pdf":
             path, _ = QtWidgets.QFileDialog.getSaveFileName(
                 self, "Exportar PDF", "", "PDF (*.pdf)"
@@ -1212,20 +1561,29 @@ class ReportsWidget(QtWidgets.QWidget):
             self._export_pdf(path, date_str, data)
 
     def _export_pdf(self, path: str, date_str: str, data: list[Dict[str, Any]]) -> None:
-        c = canvas.Canvas(path)
-        y = 800
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(40, y, f"Corte del día {date_str}")
-        y -= 20
-        c.setFont("Helvetica", 9)
-        for row in data:
-            line = f"{row['barcode']} - {row['name']} - {row['quantity']:.2f} - {format_money(row['total'])}"
-            c.drawString(40, y, line[:120])
-            y -= 12
-            if y < 40:
-                c.showPage()
-                y = 800
-        c.save()
+        from reportlab.lib import colors
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import Paragraph, SimpleDocTemplate, Table, TableStyle
+
+        table_data = [["Código", "Producto", "Cant.", "Total"]]
+        table_data += [
+            [row["barcode"], row["name"], f"{row['quantity']:.2f}", format_money(row["total"])]
+            for row in data
+        ]
+        # repeatRows repite el encabezado en cada página; la paginación la hace reportlab
+        table = Table(table_data, repeatRows=1)
+        table.setStyle(
+            TableStyle(
+                [
+                    ("FONT", (0, 0), (-1, 0), "Helvetica-Bold", 9),
+                    ("FONT", (0, 1), (-1, -1), "Helvetica", 9),
+                    ("LINEBELOW", (0, 0), (-1, 0), 0.5, colors.grey),
+                    ("ALIGN", (2, 0), (-1, -1), "RIGHT"),
+                ]
+            )
+        )
+        title = Paragraph(f"Corte del día {date_str}", getSampleStyleSheet()["Heading2"])
+        SimpleDocTemplate(path).build([title, table])
 
 
 class SimpleListDialog(QtWidgets.QDialog):
@@ -1349,6 +1707,7 @@ class CurrencyDialog(QtWidgets.QDialog):
 
     def save(self) -> None:
         set_setting("currency_symbol", self.symbol_input.text().strip() or "$")
+        invalidate_currency_symbol()
 
 
 class TicketDialog(QtWidgets.QDialog):
@@ -1378,13 +1737,155 @@ class TicketDialog(QtWidgets.QDialog):
         set_setting("ticket_footer", self.footer_input.text().strip())
 
 
+TICKETS_DIR = Path(__file__).resolve().parent.parent / "data" / "tickets"
+
+
+@functools.lru_cache(maxsize=None)
+def _tickets_dir() -> Path:
+    # mkdir una vez por proceso, no en cada ticket
+    TICKETS_DIR.mkdir(parents=True, exist_ok=True)
+    return TICKETS_DIR
+
+
+def ticket_settings() -> Dict[str, str]:
+    # Valores que el ticket necesita; se leen una vez y viajan con cada trabajo
+    return {
+        "company_name": get_setting("company_name", "Abarrotes"),
+        "ticket_footer": get_setting("ticket_footer", "Gracias por su compra"),
+        "currency_symbol": get_currency_symbol(),
+    }
+
+
+def render_ticket(
+    sale_id: int,
+    items: list[Dict[str, Any]],
+    subtotal: float,
+    discount: float,
+    payment: float | None,
+    change: float | None,
+    settings: Mapping[str, str],
+    reprint: bool = False,
+) -> Path:
+    # Función pura: no toca SQLite ni Qt, así corre en hilos o en otros procesos
+    from reportlab.lib.units import mm
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from reportlab.pdfgen import canvas
+
+    # Una reimpresión nunca pisa el ticket original de la venta
+    prefix = "reimpresion" if reprint else "venta"
+    ticket_path = _tickets_dir() / f"{prefix}_{sale_id}.pdf"
+    money = functools.partial(_FMT, settings["currency_symbol"])
+
+    taxable = max(0.0, subtotal - discount)
+    total = taxable
+
+    # Textos de cada renglón armados antes de abrir el canvas; el ciclo solo dibuja
+    lines = [
+        (
+            item["short_name"],
+            f"{item['quantity']:.2f} x {money(item['price'])}",
+            money(item["line_total"]),
+        )
+        for item in items
+    ]
+
+    width = 80 * mm
+    height = 200 * mm
+    # Búfer de 64 KB: el PDF llega al disco en pocas escrituras; with cierra siempre
+    with open(ticket_path, "wb", buffering=65536) as handle:
+        c = canvas.Canvas(handle, pagesize=(width, height))
+        y = height - 10 * mm
+
+        c.setFont("Helvetica-Bold", 10)
+        c.drawString(8 * mm, y, settings["company_name"])
+        y -= 6 * mm
+        c.setFont("Helvetica", 8)
+        c.drawString(8 * mm, y, f"Venta #{sale_id}" + (" (reimpresión)" if reprint else ""))
+        y -= 5 * mm
+
+        # Todos los renglones en un solo objeto de texto (un bloque BT…ET)
+        right = width - 6 * mm
+        text = c.beginText()
+        text.setFont("Helvetica", 8)
+        for name, line, amount in lines:
+            text.setTextOrigin(8 * mm, y)
+            text.textOut(name)
+            y -= 4 * mm
+            text.setTextOrigin(8 * mm, y)
+            text.textOut(line)
+            text.setTextOrigin(right - stringWidth(amount, "Helvetica", 8), y)
+            text.textOut(amount)
+            y -= 5 * mm
+        c.drawText(text)
+
+        y -= 2 * mm
+        c.drawString(8 * mm, y, "Subtotal:")
+        c.drawRightString(width - 6 * mm, y, money(subtotal))
+        y -= 4 * mm
+        c.drawString(8 * mm, y, "Descuento:")
+        c.drawRightString(width - 6 * mm, y, money(discount))
+        y -= 4 * mm
+        c.setFont("Helvetica-Bold", 9)
+        c.drawString(8 * mm, y, "Total:")
+        c.drawRightString(width - 6 * mm, y, money(total))
+        c.setFont("Helvetica", 8)
+        # Pago y cambio no se guardan en la venta: la reimpresión los omite
+        if payment is not None and change is not None:
+            y -= 5 * mm
+            c.drawString(8 * mm, y, "Pago con:")
+            c.drawRightString(width - 6 * mm, y, money(payment))
+            y -= 4 * mm
+            c.drawString(8 * mm, y, "Cambio:")
+            c.drawRightString(width - 6 * mm, y, money(change))
+
+        y -= 8 * mm
+        c.setFont("Helvetica", 8)
+        c.drawString(8 * mm, y, settings["ticket_footer"][:40])
+
+        c.showPage()
+        c.save()
+    return ticket_path
+
+
+def render_tickets(
+    jobs: list[tuple[int, list[Dict[str, Any]], float, float, float | None, float | None]],
+    settings: Mapping[str, str],
+    reprint: bool = False,
+) -> list[Path]:
+    # Un ciclo en el hilo del DbWorker: cada ticket es una página pequeña y un proceso
+    # aparte costaría más en arranque (PySide6, reportlab) que en dibujo
+    return [render_ticket(*job, settings, reprint) for job in jobs]
+
+
+def reprint_day_tickets(date_str: str, settings: Mapping[str, str]) -> list[Path]:
+    # Copias de los tickets del día, sin pago ni cambio porque no se guardan
+    jobs = []
+    rows = get_day_sale_items(date_str)
+    for sale_id, group in itertools.groupby(rows, key=lambda row: row["sale_id"]):
+        items = [dict(row) for row in group]
+        sale = items[0]
+        jobs.append((sale_id, items, sale["subtotal"], sale["discount"], None, None))
+    return render_tickets(jobs, settings, reprint=True)
+
+
 class SalesWidget(QtWidgets.QWidget):
     def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
         super().__init__(parent)
         self.cart: Dict[str, Dict[str, Any]] = {}
         self.last_ticket_path: Path | None = None
+        # Tickets en curso, por objeto de señales, hasta que devuelven su resultado
+        self._ticket_jobs: Dict[QtCore.QObject, DbWorker] = {}
+        self._latest_ticket: QtCore.QObject | None = None
+        # Renglón de la tabla por código y suma acumulada de line_cents
+        self._row_of: Dict[str, int] = {}
+        self._subtotal = 0
         # IVA se desactiva; forzamos 0
         self.tax_rate = 0.0
+        # Agrupa los cambios rápidos de descuento/pago en un solo recálculo
+        self._totals_timer = QtCore.QTimer(self)
+        self._totals_timer.setSingleShot(True)
+        self._totals_timer.setInterval(40)
+        self._totals_timer.timeout.connect(self._update_totals_only)
 
         self.barcode_input = QtWidgets.QLineEdit()
         self.barcode_input.setPlaceholderText("Escanea el código de barras")
@@ -1403,13 +1904,13 @@ class SalesWidget(QtWidgets.QWidget):
         self.discount_input.setDecimals(2)
         self.discount_input.setMaximum(999999)
         self.discount_input.setPrefix(f"{get_currency_symbol()} ")
-        self.discount_input.valueChanged.connect(self.update_table)
+        self.discount_input.valueChanged.connect(self._schedule_totals)
 
         self.payment_input = QtWidgets.QDoubleSpinBox()
         self.payment_input.setDecimals(2)
         self.payment_input.setMaximum(999999)
         self.payment_input.setPrefix(f"{get_currency_symbol()} ")
-        self.payment_input.valueChanged.connect(self.update_table)
+        self.payment_input.valueChanged.connect(self._schedule_totals)
 
         self.clear_button = QtWidgets.QPushButton("Vaciar carrito")
         self.clear_button.clicked.connect(self.clear_cart)
@@ -1424,6 +1925,9 @@ class SalesWidget(QtWidgets.QWidget):
         self.print_button.setEnabled(False)
         self.print_button.clicked.connect(self.open_last_ticket)
 
+        self.print_ticket_checkbox = QtWidgets.QCheckBox("Imprimir ticket")
+        self.print_ticket_checkbox.setChecked(True)
+
         self.new_product_button = QtWidgets.QPushButton("Nuevo producto")
         self.new_product_button.clicked.connect(self.open_add_product)
 
@@ -1476,6 +1980,7 @@ class SalesWidget(QtWidgets.QWidget):
         actions_layout.addStretch(1)
         actions_layout.addWidget(self.remove_button)
         actions_layout.addWidget(self.clear_button)
+        actions_layout.addWidget(self.print_ticket_checkbox)
         actions_layout.addWidget(self.checkout_button)
 
         layout = QtWidgets.QVBoxLayout(self)
@@ -1490,61 +1995,99 @@ class SalesWidget(QtWidgets.QWidget):
             return
 
         qty = float(self.qty_input.value())
-        product = get_product_by_barcode(barcode)
-        if product is None:
-            QtWidgets.QApplication.beep()
-            self._status_message("Producto no encontrado", 3000)
-            return
-
-        if barcode in self.cart:
-            self.cart[barcode]["quantity"] += qty
+        item = self.cart.get(barcode)
+        if item is not None:
+            item["quantity"] += qty
         else:
-            self.cart[barcode] = {
+            product = _product_cache(barcode)
+            if product is None:
+                QtWidgets.QApplication.beep()
+                self._status_message("Producto no encontrado", 3000)
+                return
+            price_cents = _to_cents(float(product["price"]))
+            item = self.cart[barcode] = {
                 "product_id": product["id"],
                 "barcode": product["barcode"],
                 "name": product["name"],
-                "price": float(product["price"]),
+                # Recortado una vez al entrar al carrito, no en cada ticket
+                "short_name": product["name"][:20],
+                "price": price_cents / 100,
+                "price_cents": price_cents,
                 "quantity": qty,
+                "line_cents": 0,
             }
 
-        self.cart[barcode]["line_total"] = (
-            self.cart[barcode]["price"] * self.cart[barcode]["quantity"]
-        )
+        # Centavos enteros en el carrito; line_total queda para app.db y el ticket
+        line_cents = round(item["price_cents"] * item["quantity"])
+        self._subtotal += line_cents - item["line_cents"]
+        item["line_cents"] = line_cents
+        item["line_total"] = line_cents / 100
 
         self.barcode_input.clear()
         self.qty_input.setValue(1)
-        self.update_table()
+        self._upsert_row(barcode)
+        self._update_totals_only()
+
+    def _upsert_row(self, barcode: str) -> None:
+        """Agrega el renglón del código o actualiza solo cantidad y total."""
+        item = self.cart[barcode]
+        row = self._row_of.get(barcode)
+        if row is None:
+            row = self._row_of[barcode] = self.table.rowCount()
+            self.table.insertRow(row)
+            for column, text in enumerate(self._row_cells(item)):
+                self.table.setItem(row, column, QtWidgets.QTableWidgetItem(text))
+        else:
+            self.table.item(row, 3).setText(f"{item['quantity']:.2f}")
+            self.table.item(row, 4).setText(_format_cents(item["line_cents"]))
+
+    @staticmethod
+    def _row_cells(item: Mapping[str, Any]) -> tuple[str, ...]:
+        return (
+            item["barcode"],
+            item["name"],
+            _format_cents(item["price_cents"]),
+            f"{item['quantity']:.2f}",
+            _format_cents(item["line_cents"]),
+        )
 
     def update_table(self) -> None:
-        self.table.setRowCount(len(self.cart))
-        subtotal = 0.0
-
-        for row, item in enumerate(self.cart.values()):
-            self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(item["barcode"]))
-            self.table.setItem(row, 1, QtWidgets.QTableWidgetItem(item["name"]))
-            self.table.setItem(
-                row, 2, QtWidgets.QTableWidgetItem(format_money(item["price"]))
-            )
-            self.table.setItem(
-                row, 3, QtWidgets.QTableWidgetItem(f"{item['quantity']:.2f}")
-            )
-            self.table.setItem(
-                row, 4, QtWidgets.QTableWidgetItem(format_money(item["line_total"]))
-            )
-            subtotal += item["line_total"]
-
-        self.subtotal_label.setText(format_money(subtotal))
-        discount = float(self.discount_input.value())
-        total = max(0.0, subtotal - discount)
-        payment = float(self.payment_input.value())
-        change = max(0.0, payment - total)
-        self.discount_label.setText(format_money(discount))
-        self.total_label.setText(format_money(total))
-        self.change_label.setText(format_money(change))
+        if not self.cart and self.table.rowCount() == 0:
+            return
+        # Reconstrucción completa reutilizando los QTableWidgetItem existentes
+        items = self.cart.values()
+        _fill_table(self.table, [self._row_cells(item) for item in items])
+        self._row_of = {barcode: row for row, barcode in enumerate(self.cart)}
+        self._subtotal = sum(item["line_cents"] for item in items)
+        self._update_totals_only()
+
+    def _drop_row(self, barcode: str) -> None:
+        row = self._row_of.pop(barcode)
+        self.table.removeRow(row)
+        for code, index in self._row_of.items():
+            if index > row:
+                self._row_of[code] = index - 1
+
+    def _schedule_totals(self, _value: float) -> None:
+        self._totals_timer.start()
+
+    def _update_totals_only(self) -> None:
+        self._totals_timer.stop()
+        subtotal = self._subtotal
+        discount = _to_cents(self.discount_input.value())
+        total = max(0, subtotal - discount)
+        change = max(0, _to_cents(self.payment_input.value()) - total)
+        self.subtotal_label.setText(_format_cents(subtotal))
+        self.discount_label.setText(_format_cents(discount))
+        self.total_label.setText(_format_cents(total))
+        self.change_label.setText(_format_cents(change))
 
     def clear_cart(self) -> None:
         self.cart.clear()
-        self.update_table()
+        self._row_of.clear()
+        self.table.setRowCount(0)
+        self._subtotal = 0
+        self._update_totals_only()
         self._status_message("Carrito limpio", 2000)
 
     def remove_selected_item(self) -> None:
@@ -1557,9 +2100,11 @@ class SalesWidget(QtWidgets.QWidget):
             self._status_message("No se pudo obtener el código", 2500)
             return
         barcode = barcode_item.text()
-        if barcode in self.cart:
-            del self.cart[barcode]
-            self.update_table()
+        item = self.cart.pop(barcode, None)
+        if item is not None:
+            self._subtotal -= item["line_cents"]
+            self._drop_row(barcode)
+            self._update_totals_only()
             self._status_message("Producto quitado del carrito", 2500)
         else:
             self._status_message("No se encontró el producto en el carrito", 2500)
@@ -1569,35 +2114,34 @@ class SalesWidget(QtWidgets.QWidget):
             self._status_message("No hay productos en el carrito", 3000)
             return
 
+        # Una sola copia del carrito para el total, la venta y el ticket
+        items = list(self.cart.values())
+        subtotal = self._subtotal / 100
         try:
             discount = float(self.discount_input.value())
-            subtotal = sum(item["line_total"] for item in self.cart.values())
-            total_due = max(0.0, subtotal - discount)
+            total_due = max(0, self._subtotal - _to_cents(discount))
             payment = float(self.payment_input.value())
-            if payment < total_due:
+            if _to_cents(payment) < total_due:
                 QtWidgets.QMessageBox.warning(
                     self,
                     "Pago insuficiente",
-                    f"Total: {format_money(total_due)}\nPago con: {format_money(payment)}",
+                    f"Total: {_format_cents(total_due)}\nPago con: {format_money(payment)}",
                 )
                 return
 
-            sale_id, total = record_sale(
-                self.cart.values(), discount=discount, tax_rate=0.0
-            )
+            sale_id, total = record_sale(items, discount=discount, tax_rate=0.0)
             change = max(0.0, payment - total)
         except Exception as exc:  # noqa: BLE001
             QtWidgets.QMessageBox.critical(self, "Error", str(exc))
             return
 
-        self.last_ticket_path = self._generate_ticket_pdf(
-            sale_id,
-            list(self.cart.values()),
-            discount,
-            payment,
-            change,
-        )
-        self.print_button.setEnabled(self.last_ticket_path is not None)
+        self.print_button.setEnabled(False)
+        if self.print_ticket_checkbox.isChecked():
+            self._queue_ticket(sale_id, items, subtotal, discount, payment, change)
+        else:
+            # Venta sin ticket: ni reportlab ni archivo; un ticket pendiente ya no aplica
+            self.last_ticket_path = None
+            self._latest_ticket = None
         self.clear_cart()
         self.discount_input.setValue(0)
         self.payment_input.setValue(0)
@@ -1628,81 +2172,56 @@ class SalesWidget(QtWidgets.QWidget):
             )
             return
 
+        _product_cache.cache_clear()
         self._status_message("Producto agregado", 3000)
 
     def open_daily_report(self) -> None:
         dialog = DailyReportDialog(self)
         dialog.exec()
 
-    def open_last_ticket(self) -> None:
-        if self.last_ticket_path and self.last_ticket_path.exists():
-            QtGui.QDesktopServices.openUrl(
-                QtCore.QUrl.fromLocalFile(str(self.last_ticket_path))
-            )
-
-    def _generate_ticket_pdf(
+    def _queue_ticket(
         self,
         sale_id: int,
         items: list[Dict[str, Any]],
+        subtotal: float,
         discount: float,
         payment: float,
         change: float,
-    ) -> Path | None:
-        tickets_dir = Path(__file__).resolve().parent.parent / "data" / "tickets"
-        tickets_dir.mkdir(parents=True, exist_ok=True)
-        ticket_path = tickets_dir / f"venta_{sale_id}.pdf"
-
-        subtotal = sum(item["line_total"] for item in items)
-        taxable = max(0.0, subtotal - discount)
-        total = taxable
-
-        width = 80 * mm
-        height = 200 * mm
-        c = canvas.Canvas(str(ticket_path), pagesize=(width, height))
-        y = height - 10 * mm
-
-        company = get_setting("company_name", "Abarrotes")
-        c.setFont("Helvetica-Bold", 10)
-        c.drawString(8 * mm, y, company)
-        y -= 6 * mm
-        c.setFont("Helvetica", 8)
-        c.drawString(8 * mm, y, f"Venta #{sale_id}")
-        y -= 5 * mm
-
-        for item in items:
-            c.drawString(8 * mm, y, item["name"][:20])
-            y -= 4 * mm
-            line = f"{item['quantity']:.2f} x {format_money(item['price'])}"
-            c.drawString(8 * mm, y, line)
-            c.drawRightString(width - 6 * mm, y, format_money(item["line_total"]))
-            y -= 5 * mm
-
-        y -= 2 * mm
-        c.drawString(8 * mm, y, "Subtotal:")
-        c.drawRightString(width - 6 * mm, y, format_money(subtotal))
-        y -= 4 * mm
-        c.drawString(8 * mm, y, "Descuento:")
-        c.drawRightString(width - 6 * mm, y, format_money(discount))
-        y -= 4 * mm
-        c.setFont("Helvetica-Bold", 9)
-        c.drawString(8 * mm, y, "Total:")
-        c.drawRightString(width - 6 * mm, y, format_money(total))
-        y -= 5 * mm
-        c.setFont("Helvetica", 8)
-        c.drawString(8 * mm, y, "Pago con:")
-        c.drawRightString(width - 6 * mm, y, format_money(payment))
-        y -= 4 * mm
-        c.drawString(8 * mm, y, "Cambio:")
-        c.drawRightString(width - 6 * mm, y, format_money(change))
-
-        footer = get_setting("ticket_footer", "Gracias por su compra")
-        y -= 8 * mm
-        c.setFont("Helvetica", 8)
-        c.drawString(8 * mm, y, footer[:40])
+    ) -> None:
+        # El PDF se dibuja en el QThreadPool; la siguiente venta no espera a reportlab
+        job = DbWorker(
+            render_ticket,
+            sale_id,
+            items,
+            subtotal,
+            discount,
+            payment,
+            change,
+            ticket_settings(),
+        )
+        self._ticket_jobs[job.signals] = job
+        self._latest_ticket = job.signals
+        job.signals.result.connect(self._on_ticket_ready)
+        job.signals.error.connect(self._on_ticket_error)
+        job.start()
+
+    def _on_ticket_ready(self, path: Path | None) -> None:
+        signals = self.sender()
+        self._ticket_jobs.pop(signals, None)
+        # Un ticket anterior que termine tarde no reemplaza al de la última venta
+        if signals is self._latest_ticket:
+            self.last_ticket_path = path
+            self.print_button.setEnabled(path is not None)
+
+    def _on_ticket_error(self, message: str) -> None:
+        self._ticket_jobs.pop(self.sender(), None)
+        self._status_message(f"No se pudo generar el ticket: {message}", 4000)
 
-        c.showPage()
-        c.save()
-        return ticket_path
+    def open_last_ticket(self) -> None:
+        if self.last_ticket_path and self.last_ticket_path.exists():
+            QtGui.QDesktopServices.openUrl(
+                QtCore.QUrl.fromLocalFile(str(self.last_ticket_path))
+            )
 
     def _status_message(self, message: str, timeout: int) -> None:
         window = self.window()
@@ -1722,29 +2241,21 @@ class DashboardWindow(QtWidgets.QMainWindow):
         self.stack = QtWidgets.QStackedWidget()
         self.sales_widget = SalesWidget()
 
-        self.inventory_widget = InventoryWidget()
-        self.customers_widget = CustomersWidget()
-        self.suppliers_widget = SuppliersWidget()
-        self.purchases_widget = PurchasesWidget()
-        self.reports_widget = ReportsWidget()
-        self.expenses_widget = ExpensesWidget()
-        self.users_widget = UsersWidget()
-
-        self.pages = {
+        # Solo Ventas se construye al inicio; las demás páginas (y sus consultas)
+        # se crean la primera vez que se abren y switch_page guarda el widget
+        self.pages: Dict[str, Any] = {
             "Ventas": self.sales_widget,
-            "Inventario": self.inventory_widget,
-            "Clientes": self.customers_widget,
-            "Proveedor": self.suppliers_widget,
-            "Compras": self.purchases_widget,
-            "Reportes": self.reports_widget,
-            "Configuración": self._config_page(),
-            "Gastos": self.expenses_widget,
-            "Usuarios": self.users_widget,
-            "Información": self._placeholder_page("Información"),
+            "Inventario": InventoryWidget,
+            "Clientes": CustomersWidget,
+            "Proveedor": SuppliersWidget,
+            "Compras": PurchasesWidget,
+            "Reportes": ReportsWidget,
+            "Configuración": self._config_page,
+            "Gastos": ExpensesWidget,
+            "Usuarios": UsersWidget,
+            "Información": lambda: self._placeholder_page("Información"),
         }
-
-        for widget in self.pages.values():
-            self.stack.addWidget(widget)
+        self.stack.addWidget(self.sales_widget)
 
         sidebar = QtWidgets.QFrame()
         sidebar.setObjectName("sidebar")
@@ -1761,7 +2272,7 @@ class DashboardWindow(QtWidgets.QMainWindow):
         for name in self.pages.keys():
             button = QtWidgets.QPushButton(name)
             button.setCheckable(True)
-            button.clicked.connect(lambda checked, n=name: self.switch_page(n))
+            button.clicked.connect(functools.partial(self.switch_page, name))
             self.nav_buttons[name] = button
             sidebar_layout.addWidget(button)
 
@@ -1783,6 +2294,12 @@ class DashboardWindow(QtWidgets.QMainWindow):
         main_layout.addWidget(content_frame, 1)
         self.setCentralWidget(main)
 
+        # Refresca las estadísticas del planificador en sesiones largas
+        self.optimize_timer = QtCore.QTimer(self)
+        self.optimize_timer.setInterval(60 * 60 * 1000)
+        self.optimize_timer.timeout.connect(optimize_database)
+        self.optimize_timer.start()
+
         self._apply_dashboard_style()
         self.switch_page("Ventas")
 
@@ -1834,7 +2351,7 @@ class DashboardWindow(QtWidgets.QMainWindow):
             button = QtWidgets.QPushButton(label)
             button.setObjectName("tileButton")
             button.setFixedSize(170, 110)
-            button.clicked.connect(lambda checked, text=label: self._handle_config_action(text))
+            button.clicked.connect(functools.partial(self._handle_config_action, label))
             row = index // 5
             col = index % 5
             grid.addWidget(button, row, col)
@@ -1845,7 +2362,7 @@ class DashboardWindow(QtWidgets.QMainWindow):
         layout.addStretch(1)
         return widget
 
-    def _handle_config_action(self, action: str) -> None:
+    def _handle_config_action(self, action: str, _checked: bool = False) -> None:
         if action == "Categorías":
             dialog = SimpleListDialog(
                 "Categorías",
@@ -1880,6 +2397,8 @@ class DashboardWindow(QtWidgets.QMainWindow):
             )
             if path:
                 restore_database(Path(path))
+                invalidate_currency_symbol()
+                _product_cache.cache_clear()
         elif action == "Eliminar registros DB":
             confirm = QtWidgets.QMessageBox.question(
                 self, "Eliminar", "¿Eliminar ventas, compras y gastos?"
@@ -1907,8 +2426,8 @@ class DashboardWindow(QtWidgets.QMainWindow):
         )
         if not path:
             return
-        df = pd.DataFrame(columns=["barcode", "name", "price", "stock"])
-        df.to_csv(path, index=False)
+        # Solo el encabezado; no vale la pena cargar pandas para una línea
+        Path(path).write_text("barcode,name,price,stock\n", encoding="utf-8")
 
     def _import_products(self) -> None:
         path, _ = QtWidgets.QFileDialog.getOpenFileName(
@@ -1916,10 +2435,21 @@ class DashboardWindow(QtWidgets.QMainWindow):
         )
         if not path:
             return
-        if path.lower().endswith(".xlsx"):
-            df = pd.read_excel(path)
-        else:
-            df = pd.read_csv(path)
+        pd = _get_pd()
+        # Todo como texto: sin inferencia, y sin convertir el código "0001" en 1.0
+        dtypes = dict.fromkeys(("barcode", "name", "price", "stock"), str)
+        try:
+            if path.lower().endswith(".xlsx"):
+                # El lector openpyxl de pandas abre el libro en modo read_only
+                df = pd.read_excel(path, engine="openpyxl", dtype=dtypes)
+            else:
+                # na_filter=False: las celdas vacías llegan como "" y las filtra el paso
+                # de abajo; un nombre como "N/A" se importa tal cual
+                df = pd.read_csv(path, dtype=dtypes, engine="c", na_filter=False)
+        except (ValueError, OSError, zipfile.BadZipFile) as exc:
+            # ValueError cubre ParserError y UnicodeDecodeError; OSError, archivos bloqueados
+            QtWidgets.QMessageBox.warning(self, "Formato", f"No se pudo leer el archivo: {exc}")
+            return
 
         required = {"barcode", "name", "price", "stock"}
         if not required.issubset(set(df.columns)):
@@ -1928,20 +2458,31 @@ class DashboardWindow(QtWidgets.QMainWindow):
             )
             return
 
-        for _, row in df.iterrows():
-            barcode = str(row["barcode"]).strip()
-            name = str(row["name"]).strip()
-            price = float(row["price"])
-            stock = float(row["stock"])
-            if not barcode or not name:
-                continue
-            existing = get_product_by_barcode(barcode)
-            if existing is None:
-                add_product(barcode, name, price, stock)
-            else:
-                update_product(int(existing["id"]), barcode, name, price, stock)
+        read_rows = len(df)
+        # Celdas vacías de Excel (NaN) o CSV ("") descartan la fila
+        df = df.dropna(subset=["barcode", "name"])
+        for column in ("barcode", "name"):
+            df[column] = df[column].str.strip()
+        df = df[(df["barcode"] != "") & (df["name"] != "")]
+        # Un precio o stock no numérico ("12,50", "N/A") se omite y se cuenta en el
+        # aviso final; un NULL en price o stock tumbaría el lote entero
+        for column in ("price", "stock"):
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+        df = df.dropna(subset=["price", "stock"])
+        columns = df[["barcode", "name", "price", "stock"]]
+        try:
+            bulk_upsert_products(columns.itertuples(index=False, name=None))
+        except Exception as exc:  # noqa: BLE001
+            QtWidgets.QMessageBox.critical(self, "Error", str(exc))
+            return
 
-        self.inventory_widget.refresh_list()
+        # El inventario relee la lista en su showEvent
+        _product_cache.cache_clear()
+        message = f"Productos importados: {len(columns)}"
+        skipped = read_rows - len(columns)
+        if skipped:
+            message += f"\nFilas omitidas (datos vacíos o no numéricos): {skipped}"
+        QtWidgets.QMessageBox.information(self, "Importar", message)
 
     def _export_products(self) -> None:
         path, _ = QtWidgets.QFileDialog.getSaveFileName(
@@ -1949,70 +2490,112 @@ class DashboardWindow(QtWidgets.QMainWindow):
         )
         if not path:
             return
-        rows = list_products()
-        data = [
-            {
-                "barcode": row["barcode"],
-                "name": row["name"],
-                "price": float(row["price"]),
-                "stock": float(row["stock"]),
-            }
-            for row in rows
-        ]
-        df = pd.DataFrame(data)
+        # Las tuplas van directo a columnas, sin pasar por una lista de dicts
+        df = (
+            _get_pd()
+            .DataFrame.from_records(list_products(), columns=ProductRow._fields)
+            .drop(columns="id")
+            .astype({"price": float, "stock": float})
+        )
         if path.lower().endswith(".xlsx"):
             df.to_excel(path, index=False)
         else:
             df.to_csv(path, index=False)
 
-    def switch_page(self, name: str) -> None:
+    def switch_page(self, name: str, _checked: bool = False) -> None:
         widget = self.pages[name]
+        if not isinstance(widget, QtWidgets.QWidget):
+            widget = self.pages[name] = widget()
+            self.stack.addWidget(widget)
         self.stack.setCurrentWidget(widget)
         for button_name, button in self.nav_buttons.items():
             button.setChecked(button_name == name)
 
     def _apply_dashboard_style(self) -> None:
-        self.setStyleSheet(
-            """
-            * { font-size: 12pt; }
-            QMainWindow { background: #f2f4f8; }
-            QLabel { color: #111827; }
-            #sidebar { background: #1f2937; border-right: 1px solid #111827; }
-            #sidebarTitle { color: #ffffff; font-weight: 700; font-size: 16pt; }
-            #sidebar QPushButton {
-                text-align: left; padding: 12px 14px; border-radius: 10px;
-                color: #e5e7eb; background: transparent; font-weight: 600;
-            }
-            #sidebar QPushButton:hover { background: #374151; }
-            #sidebar QPushButton:checked { background: #2563eb; color: #ffffff; }
-            QTableWidget { background: #ffffff; border: 1px solid #e5e7eb; color: #111827; }
-            QTableWidget::item { color: #111827; }
-            QHeaderView::section { background: #e5e7eb; padding: 6px; color: #111827; }
-            QLineEdit, QDoubleSpinBox {
-                padding: 8px; border: 1px solid #d1d5db; border-radius: 6px;
-                background: #ffffff;
-            }
-            QAbstractSpinBox { color: #111827; }
-            QAbstractSpinBox::up-button, QAbstractSpinBox::down-button {
-                subcontrol-origin: border; width: 18px;
-                background: #e5e7eb; border-left: 1px solid #d1d5db;
-            }
-            QAbstractSpinBox::up-arrow, QAbstractSpinBox::down-arrow {
-                width: 8px; height: 8px; color: #111827;
-            }
-            QPushButton {
-                padding: 10px 14px; border-radius: 10px; border: none;
-                background: #2563eb; color: white; font-weight: 600;
-            }
-            QPushButton:hover { background: #1d4ed8; }
-            QPushButton:disabled { background: #9ca3af; }
-            QPushButton#tileButton {
-                background: #ffffff; color: #111827; border: 1px solid #d1d5db;
-                font-weight: 600; text-align: center;
-            }
-            QPushButton#tileButton:hover { background: #e5e7eb; }
-            """
-        )
+        self.setStyleSheet(_DASHBOARD_QSS)
+
+
+_DASHBOARD_QSS = """
+* { font-size: 12pt; }
+QMainWindow { background: #f2f4f8; }
+QLabel { color: #111827; }
+#sidebar { background: #1f2937; border-right: 1px solid #111827; }
+#sidebarTitle { color: #ffffff; font-weight: 700; font-size: 16pt; }
+#sidebar QPushButton {
+    text-align: left; padding: 12px 14px; border-radius: 10px;
+    color: #e5e7eb; background: transparent; font-weight: 600;
+}
+#sidebar QPushButton:hover { background: #374151; }
+#sidebar QPushButton:checked { background: #2563eb; color: #ffffff; }
+QTableWidget { background: #ffffff; border: 1px solid #e5e7eb; color: #111827; }
+QTableWidget::item { color: #111827; }
+QHeaderView::section { background: #e5e7eb; padding: 6px; color: #111827; }
+QLineEdit, QDoubleSpinBox {
+    padding: 8px; border: 1px solid #d1d5db; border-radius: 6px;
+    background: #ffffff;
+}
+QLineEdit#barcodeInput {
+    color: #000000; background: #ffffff; selection-color: #000000;
+    selection-background-color: #ffd54f; border: 1px solid #c0c4cc;
+}
+QAbstractSpinBox { color: #111827; }
+QAbstractSpinBox::up-button, QAbstractSpinBox::down-button {
+    subcontrol-origin: border; width: 18px;
+    background: #e5e7eb; border-left: 1px solid #d1d5db;
+}
+QAbstractSpinBox::up-arrow, QAbstractSpinBox::down-arrow {
+    width: 8px; height: 8px; color: #111827;
+}
+QPushButton {
+    padding: 10px 14px; border-radius: 10px; border: none;
+    background: #2563eb; color: white; font-weight: 600;
+}
+QPushButton:hover { background: #1d4ed8; }
+QPushButton:disabled { background: #9ca3af; }
+QPushButton#tileButton {
+    background: #ffffff; color: #111827; border: 1px solid #d1d5db;
+    font-weight: 600; text-align: center;
+}
+QPushButton#tileButton:hover { background: #e5e7eb; }
+"""
+
+_APP_QSS = """
+QDialog { background-color: #f5f7fb; }
+QDialog QLabel { color: #111827; }
+QDialog QLineEdit, QDialog QDoubleSpinBox, QDialog QComboBox,
+QDialog QDateEdit, QDialog QSpinBox, QDialog QAbstractSpinBox {
+    padding: 8px; border: 1px solid #d1d5db; border-radius: 6px;
+    background: #ffffff; color: #111827;
+}
+QDialog QComboBox QAbstractItemView {
+    background: #ffffff; color: #111827; selection-background-color: #e5e7eb;
+}
+QDialog QCalendarWidget QWidget {
+    background: #ffffff; color: #111827;
+}
+QDialog QCalendarWidget QToolButton {
+    color: #111827; background: #e5e7eb; border-radius: 6px; padding: 6px;
+}
+QDialog QCalendarWidget QMenu {
+    background: #ffffff; color: #111827;
+}
+QDialog QPushButton {
+    padding: 10px 14px; border-radius: 10px; border: none;
+    background: #2563eb; color: white; font-weight: 600;
+}
+QDialog QPushButton:hover { background: #1d4ed8; }
+QDialog#loginDialog #card { background: white; border-radius: 12px; padding: 12px; }
+QDialog#loginDialog QLineEdit {
+    padding: 8px; border: 1px solid #d0d7de; border-radius: 8px;
+    background: #ffffff; font-size: 12pt;
+}
+QDialog#loginDialog QPushButton {
+    padding: 10px; border: none; border-radius: 8px;
+    background: #2d6cdf; color: white; font-weight: bold;
+}
+QDialog#loginDialog QPushButton:hover { background: #2458b7; }
+QDialog#loginDialog QLabel { color: #1f2a44; }
+"""
 
 
 def main() -> None:
@@ -2025,40 +2608,17 @@ def main() -> None:
         set_setting("ticket_footer", "Gracias por su compra")
 
     app = QtWidgets.QApplication(sys.argv)
-    app.setStyleSheet(
-        """
-        QDialog { background-color: #f5f7fb; }
-        QDialog QLabel { color: #111827; }
-        QDialog QLineEdit, QDialog QDoubleSpinBox, QDialog QComboBox,
-        QDialog QDateEdit, QDialog QSpinBox, QDialog QAbstractSpinBox {
-            padding: 8px; border: 1px solid #d1d5db; border-radius: 6px;
-            background: #ffffff; color: #111827;
-        }
-        QDialog QComboBox QAbstractItemView {
-            background: #ffffff; color: #111827; selection-background-color: #e5e7eb;
-        }
-        QDialog QCalendarWidget QWidget {
-            background: #ffffff; color: #111827;
-        }
-        QDialog QCalendarWidget QToolButton {
-            color: #111827; background: #e5e7eb; border-radius: 6px; padding: 6px;
-        }
-        QDialog QCalendarWidget QMenu {
-            background: #ffffff; color: #111827;
-        }
-        QDialog QPushButton {
-            padding: 10px 14px; border-radius: 10px; border: none;
-            background: #2563eb; color: white; font-weight: 600;
-        }
-        QDialog QPushButton:hover { background: #1d4ed8; }
-        """
-    )
-    login = LoginDialog()
-    if login.exec() != QtWidgets.QDialog.Accepted:
-        return
-    window = DashboardWindow()
-    window.show()
-    sys.exit(app.exec())
+    app.setStyleSheet(_APP_QSS)
+    try:
+        login = LoginDialog()
+        if login.exec() != QtWidgets.QDialog.Accepted:
+            return
+        window = DashboardWindow()
+        window.show()
+        sys.exit(app.exec())
+    finally:
+        # Los DbWorker terminan antes de que atexit cierre sus conexiones
+        QtCore.QThreadPool.globalInstance().waitForDone()
 
 
 if __name__ == "__main__":